@@ -0,0 +1,479 @@
+"""
+Benchmarks for the tracker's storage and hot paths
+Run: python benchmarks.py <name> [options]
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import queue
+import random
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+import aiohttp.web
+import discord
+
+import channel_tracker as tracker
+
+# ================== SYNTHETIC DATA ==================
+
+def synthetic_dataset(creators=10_000, years=3, guilds=100, post_rate=0.6, seed=1):
+    """Creators spread over guilds, each posting on ~post_rate of days for `years` years"""
+    rng = random.Random(seed)
+    data = tracker.empty_data()
+    first_day = datetime.now().toordinal() - 365 * years
+    setup_date = date.fromordinal(first_day).isoformat()
+    
+    for n in range(creators):
+        guild_id = str(1000 + n % guilds)
+        creator_id = str(500_000 + n)
+        channel_id = str(900_000 + n)
+        unique_key = f"{guild_id}_{creator_id}"
+        calendar = tracker.PostCalendar()
+        for day in range(first_day, first_day + 365 * years):
+            if rng.random() < post_rate:
+                calendar.add(day, rng.randrange(86_400))
+        data['tracked_channels'][channel_id] = {
+            'creator_id': creator_id, 'creator_name': f"creator{n}", 'guild_id': guild_id,
+            'guild_name': f"Guild {guild_id}", 'setup_by': '1', 'setup_date': setup_date
+        }
+        data['creators'][unique_key] = {
+            'name': f"creator{n}", 'guild_id': guild_id, 'guild_name': f"Guild {guild_id}",
+            'creator_id': creator_id, 'channel_id': channel_id, 'joined': setup_date,
+            'total_posts': len(calendar), 'current_streak': 0, 'best_streak': 0,
+            'last_posted': date.fromordinal(calendar.epoch + calendar.bits.bit_length() - 1).isoformat() if calendar.bits else None,
+            'last_reminded': None
+        }
+        data['posts'][unique_key] = calendar
+    return data
+
+def timed(func, repeat=3):
+    """Best wall-clock time of `repeat` runs, in seconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+# ================== SIMULATED DISCORD ==================
+
+class FakeAuthor:
+    def __init__(self, user_id):
+        self.id = user_id
+        self.bot = False
+        self.name = f"user{user_id}"
+
+class FakeGuild:
+    def __init__(self, guild_id):
+        self.id = guild_id
+        self.name = f"Guild {guild_id}"
+        self.shard_id = 0
+
+class FakeChannel:
+    """Text channel whose sends just yield to the event loop, like a network call would"""
+    def __init__(self, channel_id, guild):
+        self.id = channel_id
+        self.name = f"channel{channel_id}"
+        self.guild = guild
+
+    async def send(self, *args, **kwargs):
+        await asyncio.sleep(0)
+
+class FakeMessage:
+    def __init__(self, guild, channel, author_id, content):
+        self.guild = guild
+        self.channel = channel
+        self.author = FakeAuthor(author_id)
+        self.content = content
+        self.replies = 0
+
+    async def add_reaction(self, emoji):
+        await asyncio.sleep(0)
+
+    async def reply(self, *args, **kwargs):
+        self.replies += 1
+        await asyncio.sleep(0)
+
+async def skip_commands(message):
+    """Stands in for bot.process_commands, which needs a live connection"""
+
+class FakeDiscordAPI:
+    """Local stand-in for the Discord REST API, with Discord-style rate limits.
+
+    Serves just the routes a reminder uses. Each route allows `route_limit`
+    requests per second and all routes together `global_limit`, answering
+    429s with retry_after like Discord does. Sends to users whose ID is a
+    multiple of `closed_every` fail with 403, as for closed DMs.
+    """
+
+    def __init__(self, global_limit=50, route_limit=25, latency=0.1, closed_every=20):
+        self.global_limit = global_limit
+        self.route_limit = route_limit
+        self.latency = latency
+        self.closed_every = closed_every
+        self.windows = {}  # bucket: (window start, requests in it)
+        self.stats = {'requests': 0, '429s': 0}
+        self.app = aiohttp.web.Application()
+        self.app.router.add_get('/api/v10/users/@me', self.get_me)
+        self.app.router.add_get('/api/v10/users/{user_id}', self.get_user)
+        self.app.router.add_post('/api/v10/users/@me/channels', self.create_dm)
+        self.app.router.add_post('/api/v10/channels/{channel_id}/messages', self.send_message)
+
+    async def start(self):
+        self.runner = aiohttp.web.AppRunner(self.app)
+        await self.runner.setup()
+        site = aiohttp.web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        return f"http://127.0.0.1:{self.runner.addresses[0][1]}/api/v10"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+    def take(self, bucket, limit):
+        """(seconds until `bucket` has room or 0 after taking a slot, slots left, seconds to reset)"""
+        now = time.monotonic()
+        start, used = self.windows.get(bucket, (now, 0))
+        if now - start >= 1:
+            start, used = now, 0
+        reset_after = 1 - (now - start)
+        if used >= limit:
+            return reset_after, 0, reset_after
+        self.windows[bucket] = (start, used + 1)
+        return 0, limit - used - 1, reset_after
+
+    async def respond(self, bucket, payload, status=200):
+        self.stats['requests'] += 1
+        retry_after, _, _ = self.take('global', self.global_limit)
+        scope = 'global'
+        if not retry_after:
+            retry_after, remaining, reset_after = self.take(bucket, self.route_limit)
+            scope = 'user'
+        if retry_after:
+            self.stats['429s'] += 1
+            # discord.py treats a 429 without Via as a Cloudflare ban
+            headers = {'X-RateLimit-Scope': scope, 'Via': '1.1 google'}
+            if scope == 'global':
+                headers['X-RateLimit-Global'] = 'true'
+            body = {'message': 'You are being rate limited.', 'retry_after': retry_after, 'global': scope == 'global'}
+            return self.json(body, 429, headers)
+        await asyncio.sleep(self.latency)
+        return self.json(payload, status, {
+            'X-RateLimit-Bucket': bucket.split()[0], 'X-RateLimit-Limit': str(self.route_limit),
+            'X-RateLimit-Remaining': str(remaining), 'X-RateLimit-Reset-After': f"{reset_after:.3f}"
+        })
+
+    @staticmethod
+    def json(payload, status, headers=None):
+        # discord.py only parses bodies whose Content-Type is exactly application/json
+        headers = {**(headers or {}), 'Content-Type': 'application/json'}
+        return aiohttp.web.Response(body=json.dumps(payload).encode(), status=status, headers=headers)
+
+    @staticmethod
+    def user(user_id):
+        return {'id': str(user_id), 'username': f"user{user_id}", 'discriminator': '0', 'avatar': None, 'global_name': None}
+
+    async def get_me(self, request):
+        return await self.respond('me', self.user(1))
+
+    async def get_user(self, request):
+        return await self.respond('get_user', self.user(request.match_info['user_id']))
+
+    async def create_dm(self, request):
+        user_id = int((await request.json())['recipient_id'])
+        return await self.respond('create_dm', {'id': str(user_id + 10**15), 'type': 1, 'recipients': [self.user(user_id)]})
+
+    async def send_message(self, request):
+        channel_id = int(request.match_info['channel_id'])
+        if (channel_id - 10**15) % self.closed_every == 0:
+            return await self.respond(f"send {channel_id}", {'message': 'Cannot send messages to this user', 'code': 50007}, 403)
+        return await self.respond(f"send {channel_id}", {
+            'id': str(channel_id), 'channel_id': str(channel_id), 'type': 0, 'content': '', 'author': self.user(1),
+            'attachments': [], 'embeds': [], 'mentions': [], 'mention_roles': [], 'pinned': False,
+            'mention_everyone': False, 'tts': False, 'timestamp': datetime.now().isoformat(), 'edited_timestamp': None
+        })
+
+# ================== BENCHMARKS ==================
+
+def bench_serializers(args):
+    """Load/save time and file size of each snapshot format"""
+    data = synthetic_dataset(args.creators, args.years)
+    print(f"Dataset: {args.creators} creators, {args.years} years, "
+          f"{sum(len(p) for p in data['posts'].values())} post days")
+    data = {'tracked_channels': data['tracked_channels'], **tracker.encode_partition(data)}
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, serializer in tracker.SERIALIZERS.items():
+            if name == 'msgpack' and tracker.msgpack is None:
+                print(f"{name:>8}: skipped (msgpack not installed)")
+                continue
+            path = os.path.join(tmp, name)
+            save = timed(lambda: tracker.write_atomic(path, serializer.dumps(data)))
+            load = timed(lambda: tracker.read_newest_valid(path, 0))
+            size = os.path.getsize(path)
+            print(f"{name:>8}: save {save * 1000:8.1f} ms | load {load * 1000:8.1f} ms | {size / 1e6:8.2f} MB")
+
+def bench_weekly(args):
+    """!weekly numbers for one server over 7, 30 and 90 days"""
+    data = synthetic_dataset(args.creators, args.years, guilds=1)
+    partition = {'creators': data['creators'], 'posts': data['posts']}
+    today = datetime.now().toordinal()
+    print(f"One server with {args.creators} creators, {args.years} years of history")
+    
+    for days in (7, 30, 90):
+        took = timed(lambda: tracker.activity_report(partition, today, days), repeat=5)
+        print(f"{days:>3}-day report {took * 1000:8.2f} ms")
+
+def bench_keywords(args):
+    """Per-message cost of post detection, compiled matcher vs the old keyword loop"""
+    posted_keywords = ['posted', 'done', 'uploaded', 'posted for today', 'posted today']
+    filler = "just chatting about the video idea for tomorrow, what do you think? "
+    messages = {
+        'short hit': "posted today!",
+        'short miss': "hey everyone",
+        'long hit': filler * 6 + "posted " + filler * 24,  # Late, but inside KEYWORD_SCAN_CHARS
+        'long miss': filler * 30,
+    }
+    matchers = {
+        'compiled': tracker.compile_keywords(posted_keywords),
+        'word-bound': tracker.compile_keywords(posted_keywords, word_boundary=True),
+    }
+    for label, content in messages.items():
+        expected = any(k in content.lower() for k in posted_keywords)
+        for name, matcher in matchers.items():
+            if (matcher.search(content[:tracker.KEYWORD_SCAN_CHARS].lower()) is not None) != expected:
+                raise SystemExit(f"FAILED: {name} matcher disagrees with the keyword loop on '{label}'")
+    
+    n = 20_000
+    for label, content in messages.items():
+        loop = timed(lambda: [any(k in content.lower() for k in posted_keywords) for _ in range(n)])
+        line = f"{label:>10} ({len(content):>4} chars): loop {loop / n * 1e6:6.2f} us"
+        for name, matcher in matchers.items():
+            took = timed(lambda: [matcher.search(content[:tracker.KEYWORD_SCAN_CHARS].lower()) for _ in range(n)])
+            line += f" | {name} {took / n * 1e6:6.2f} us"
+        print(line)
+
+async def stress_posts(store, creators, guilds, copies):
+    """Fire `copies` concurrent 'posted' messages per creator while compaction and eviction run"""
+    today = datetime.now().strftime('%Y-%m-%d')
+    messages = []
+    for n in range(creators):
+        guild = FakeGuild(1000 + n % guilds)
+        channel = FakeChannel(900_000 + n, guild)
+        await store.record({
+            'op': 'setup', 'channel_id': str(channel.id), 'creator_id': str(500_000 + n),
+            'creator_name': f"creator{n}", 'guild_id': str(guild.id), 'guild_name': guild.name,
+            'setup_by': '1', 'date': today
+        })
+        messages += [FakeMessage(guild, channel, 500_000 + n, "posted today") for _ in range(copies)]
+    await store.compact()
+    store.evict_idle()
+    random.Random(1).shuffle(messages)
+    
+    storm = asyncio.ensure_future(asyncio.gather(*(tracker.on_message(m) for m in messages)))
+    start = time.perf_counter()
+    drifted, checked = set(), 0
+    while not storm.done():
+        # Churn: fold the journal and drop every idle server mid-storm, first
+        # checking the rolling counters the posts updated in place
+        await store.compact()
+        drifted.update(store.check_rolling_counters())
+        checked += sum(len(partition['posts']) for partition in store.guilds.values())
+        store.evict_idle()
+        await asyncio.sleep(0.005)
+    await storm
+    took = time.perf_counter() - start
+    await store.compact()
+    return messages, took, drifted, checked
+
+def bench_concurrency(args):
+    """Concurrent posts across servers, checking none are lost or counted twice"""
+    copies, guilds = 2, 100
+    saved = tracker.store, tracker.GUILD_IDLE_TIMEOUT, tracker.bot.process_commands
+    with tempfile.TemporaryDirectory() as tmp:
+        store = tracker.TrackingStore(tracker.JsonPersistence(tmp))
+        store.listeners, store.unload_listeners = saved[0].listeners, saved[0].unload_listeners
+        tracker.store, tracker.GUILD_IDLE_TIMEOUT, tracker.bot.process_commands = store, 0, skip_commands
+        try:
+            asyncio.run(store.load())
+            messages, took, drifted, checked = asyncio.run(stress_posts(store, args.creators, guilds, copies))
+        finally:
+            tracker.store, tracker.GUILD_IDLE_TIMEOUT, tracker.bot.process_commands = saved
+        on_disk = tracker.load_everything(tracker.JsonPersistence(tmp))
+    
+    today = datetime.now().toordinal()
+    recorded = sum(today in calendar for calendar in on_disk['posts'].values())
+    doubled = sum(creator['total_posts'] > 1 for creator in on_disk['creators'].values())
+    duplicates = sum(message.replies for message in messages)
+    print(f"{len(messages)} messages from {args.creators} creators in {guilds} servers: "
+          f"{took:.2f} s, {len(messages) / took:,.0f} messages/s")
+    print(f"recorded {recorded}/{args.creators} | lost {args.creators - recorded} | doubled {doubled} | "
+          f"duplicates rejected {duplicates}/{len(messages) - args.creators}")
+    print(f"store: {store.stats}")
+    print(f"rolling counters out of step: {len(drifted)} ({checked} checks mid-storm)")
+    if recorded != args.creators or doubled or drifted:
+        raise SystemExit(f"FAILED: {args.creators - recorded} posts lost, {doubled} counted twice, "
+                         f"{len(drifted)} rolling counters out of step")
+
+async def overdue_store(tmp, creators, first_user_id, dm_channels=False):
+    """Store with `creators` creators in 10 servers, all last posting three days ago"""
+    store = tracker.TrackingStore(tracker.JsonPersistence(tmp))
+    await store.load()
+    posted = datetime.now() - timedelta(days=3)
+    for n in range(creators):
+        user_id = first_user_id + n
+        await store.record({
+            'op': 'post', 'guild_id': str(1000 + n % 10), 'guild_name': 'Guild', 'creator_id': str(user_id),
+            'creator_name': f"creator{n}", 'channel_id': str(900_000 + n), 'channel_name': 'channel',
+            'date': posted.strftime('%Y-%m-%d'), 'timestamp': posted.isoformat()
+        })
+        if dm_channels:
+            # Channel IDs as FakeDiscordAPI hands them out
+            await store.record({'op': 'dm', 'guild_id': str(1000 + n % 10), 'key': f"{1000 + n % 10}_{user_id}",
+                                'channel_id': str(user_id + 10**15), 'closed': None})
+    await store.compact()
+    return store
+
+async def reminder_sweep(creators, first_user_id, dispatcher, dm_channels=False):
+    """Time one sweep over an all-overdue store against the fake API"""
+    saved = tracker.store, tracker.reminders, tracker.dispatcher
+    with tempfile.TemporaryDirectory() as tmp:
+        store = await overdue_store(tmp, creators, first_user_id, dm_channels)
+        journal_writes = []
+        append_batch = store.persistence.append_batch
+        store.persistence.append_batch = lambda batch: (journal_writes.append(len(batch)), append_batch(batch))
+        store.listeners, store.unload_listeners = saved[0].listeners, saved[0].unload_listeners
+        tracker.store, tracker.reminders, tracker.dispatcher = store, tracker.ReminderScheduler(), dispatcher
+        try:
+            await tracker.leader.heartbeat()  # Only the lease holder sends reminders
+            tracker.schedule_all_reminders()
+            await tracker.check_reminders.coro()
+        finally:
+            tracker.store, tracker.reminders, tracker.dispatcher = saved
+        reminded = sum(bool(info['last_reminded']) for info in tracker.load_everything(store.persistence)['creators'].values())
+    return journal_writes, reminded
+
+async def run_reminder_benchmark(args):
+    api = FakeDiscordAPI()
+    base, discord.http.Route.BASE = discord.http.Route.BASE, await api.start()
+    try:
+        await tracker.bot.http.static_login('fake-token')
+        paced = tracker.ReminderDispatcher()
+        configs = (
+            ('one at a time', 1, tracker.ReminderDispatcher(1, float('inf'), float('inf'))),
+            ('pool, unpaced', 2, tracker.ReminderDispatcher(tracker.REMINDER_WORKERS, float('inf'), float('inf'))),
+            ('pool, paced', 3, paced),
+            ('users cached', 3, paced),  # Same creators again: no fetch_user or create_dm calls
+        )
+        configs = [(*config, False) for config in configs]
+        configs.append(('DMs stored', 4, tracker.ReminderDispatcher(), True))  # Cold caches, stored DM channel IDs
+        for label, users, dispatcher, dm_channels in configs:
+            requests, rejected = api.stats['requests'], api.stats['429s']
+            sent, closed, failed = (dispatcher.stats[key] for key in ('sent', 'closed', 'failed'))
+            journal_writes, reminded = await reminder_sweep(args.reminders, 10**6 * users, dispatcher, dm_channels)
+            stats = dispatcher.stats
+            print(f"{label:>14}: {stats['last_sweep_seconds']:6.2f} s | {stats['last_sweep_rate']:6.1f} DMs/s | "
+                  f"sent {stats['sent'] - sent} closed {stats['closed'] - closed} failed {stats['failed'] - failed} | "
+                  f"API requests {api.stats['requests'] - requests} "
+                  f"429s {api.stats['429s'] - rejected} | journal writes {len(journal_writes)} ({reminded} reminded)")
+            if reminded != stats['sent'] - sent:
+                raise SystemExit(f"FAILED: {stats['sent'] - sent} reminders sent but {reminded} recorded")
+    finally:
+        await tracker.bot.http.close()
+        await api.stop()
+        discord.http.Route.BASE = base
+
+def bench_reminders(args):
+    """One reminder sweep against a local fake Discord API, sequential vs worker pool"""
+    print(f"{args.reminders} overdue creators, 1 in 20 with closed DMs, {tracker.REMINDER_WORKERS} workers")
+    asyncio.run(run_reminder_benchmark(args))
+
+def cluster_worker(path, worker, workers, creators, guilds, ready, results):
+    """One cluster worker: set up its share of servers, then wait for the others and post"""
+    store = tracker.TrackingStore(tracker.SqlitePersistence(path))
+    tracker.store, tracker.bot.process_commands = store, skip_commands
+    asyncio.run(store.load())
+    today = datetime.now().strftime('%Y-%m-%d')
+    messages = []
+    for n in range(creators):
+        guild = FakeGuild(1000 + n % guilds)
+        if guild.id % workers != worker:  # Each worker owns its own servers, as shard ranges split them
+            continue
+        channel = FakeChannel(900_000 + n, guild)
+        asyncio.run(store.record({
+            'op': 'setup', 'channel_id': str(channel.id), 'creator_id': str(500_000 + n),
+            'creator_name': f"creator{n}", 'guild_id': str(guild.id), 'guild_name': guild.name,
+            'setup_by': '1', 'date': today
+        }))
+        # A post, then the same creator saying it again the same day
+        messages += [FakeMessage(guild, channel, 500_000 + n, "posted today") for _ in range(2)]
+    
+    async def storm():
+        # Messages in flight at once, as a busy gateway delivers them
+        await asyncio.gather(*(tracker.on_message(message) for message in messages))
+    
+    ready.wait()
+    start = time.monotonic()  # System-wide clock, so workers' times line up
+    asyncio.run(storm())
+    results.put((len(messages), start, time.monotonic()))
+    store.close()
+
+def bench_cluster(args):
+    """Message throughput of K worker processes sharing one SQLite file in WAL mode"""
+    cpus = os.cpu_count() or 1
+    guilds = 100
+    sizes = sorted({2 ** i for i in range(cpus.bit_length())} | {2, cpus})
+    context = multiprocessing.get_context('spawn')  # Fresh interpreters, like the launcher's workers
+    print(f"{args.creators} creators in {guilds} servers, 2 messages each, {cpus} CPUs")
+    base = None
+    for workers in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'cluster.db')
+            tracker.SqlitePersistence(path).db.close()  # Create the schema and WAL once, up front
+            ready, results = context.Barrier(workers), context.Queue()
+            procs = [context.Process(target=cluster_worker,
+                                     args=(path, worker, workers, args.creators, guilds, ready, results))
+                     for worker in range(workers)]
+            for proc in procs:
+                proc.start()
+            runs = []
+            while len(runs) < workers:
+                try:
+                    runs.append(results.get(timeout=1))
+                except queue.Empty:
+                    if any(proc.exitcode for proc in procs):
+                        raise RuntimeError("a cluster worker crashed")
+            for proc in procs:
+                proc.join()
+            on_disk = tracker.load_everything(tracker.SqlitePersistence(path))
+        
+        messages = sum(count for count, _, _ in runs)
+        took = max(end for _, _, end in runs) - min(start for _, start, _ in runs)
+        rate = messages / took
+        base = base or rate
+        recorded = sum(creator['total_posts'] for creator in on_disk['creators'].values())
+        print(f"{workers:>3} workers: {took:6.2f} s | {rate:8,.0f} messages/s | "
+              f"speedup {rate / base:4.2f}x ({rate / base / workers:4.0%} of linear) | "
+              f"posts recorded {recorded}/{args.creators}")
+
+BENCHMARKS = {
+    'serializers': bench_serializers,
+    'weekly': bench_weekly,
+    'keywords': bench_keywords,
+    'concurrency': bench_concurrency,
+    'reminders': bench_reminders,
+    'cluster': bench_cluster,
+}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('name', choices=sorted(BENCHMARKS))
+    parser.add_argument('--creators', type=int, default=10_000)
+    parser.add_argument('--years', type=int, default=3)
+    parser.add_argument('--reminders', type=int, default=100)
+    args = parser.parse_args()
+    BENCHMARKS[args.name](args)
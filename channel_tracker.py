@@ -5,46 +5,1440 @@ Tracks posts separately for each Discord server
 
 import discord
 from discord.ext import commands, tasks
+import argparse
+import asyncio
 import json
 import os
-from datetime import datetime, timedelta
+import re
+import signal
+import socket
+import sqlite3
+import subprocess
+import sys
+import time
+from array import array
+from collections import OrderedDict
+from heapq import heapify, heappop, heappush
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
 from dotenv import load_dotenv
 
+# Optional fast serializers for snapshots
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# File locks for the shared JSON journal and lease file (POSIX only)
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
 load_dotenv()
 
 # Configuration
 DISCORD_TOKEN = os.getenv('DISCORD_TOKEN')
 REMINDER_DAYS = 2  # Remind every 2 days if they haven't posted
-DATA_FILE = 'server_tracking.json'
+REMINDER_RETRY = timedelta(hours=12)  # Try again this long after a reminder DM fails
+DM_CLOSED_RETRY = timedelta(days=int(os.getenv('DM_CLOSED_RETRY_DAYS', '7')))  # Leave closed DMs alone this long
+REMINDER_WORKERS = int(os.getenv('REMINDER_WORKERS', '8'))  # Reminder DMs in flight at once
+REMINDER_GLOBAL_RATE = float(os.getenv('REMINDER_GLOBAL_RATE', '40'))  # API requests/s for reminders; Discord allows 50 in total
+REMINDER_ROUTE_RATE = float(os.getenv('REMINDER_ROUTE_RATE', '20'))  # API requests/s on any one route
+USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', '10000'))  # Users kept after a member query or fetch_user
+USER_CACHE_TTL = float(os.getenv('USER_CACHE_TTL', '3600'))  # Seconds before a cached user is fetched again
+DATA_DIR = os.getenv('DATA_DIR', 'server_tracking')  # Channel index, per-server snapshots and journal
+DATA_FILE = 'server_tracking.json'  # Old single-file dataset, split into DATA_DIR on first start
+JOURNAL_FILE = 'server_tracking.log'  # Journal that went with DATA_FILE
+COMPACT_INTERVAL = float(os.getenv('COMPACT_INTERVAL', '300'))  # Max seconds between snapshots
+COMPACT_MAX_RECORDS = int(os.getenv('COMPACT_MAX_RECORDS', '1000'))  # Snapshot early after this many journal records
+SNAPSHOT_GENERATIONS = int(os.getenv('SNAPSHOT_GENERATIONS', '3'))  # Older snapshots kept as <file>.1, .2, ...
+SNAPSHOT_FORMAT = os.getenv('SNAPSHOT_FORMAT', 'compact')  # 'compact', 'msgpack' or 'json' (pretty, for debugging)
+GUILD_IDLE_TIMEOUT = float(os.getenv('GUILD_IDLE_TIMEOUT', '900'))  # Unload a server's data after this many idle seconds
+STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'json')  # 'json' or 'sqlite'
+SQLITE_FILE = os.getenv('SQLITE_FILE', 'server_tracking.db')
+SQLITE_BUSY_TIMEOUT = float(os.getenv('SQLITE_BUSY_TIMEOUT', '30'))  # Seconds to wait for another process's write
+KEYWORD_SCAN_CHARS = int(os.getenv('KEYWORD_SCAN_CHARS', '500'))  # Only look for post keywords this far into a message
+SHARD_COUNT = int(os.getenv('SHARD_COUNT', '0')) or None  # Total shards; unset lets Discord recommend a count
+SHARD_IDS = [int(shard) for shard in os.getenv('SHARD_IDS', '').split(',') if shard.strip()] or None  # Shards this process runs
+SHARDED = os.getenv('SHARDED', '').lower() in ('1', 'true', 'yes') or bool(SHARD_COUNT or SHARD_IDS)  # Use AutoShardedBot
+CLUSTER_WORKERS = int(os.getenv('CLUSTER_WORKERS', '0'))  # Worker processes for --cluster; 0 means one per CPU
+CLUSTER_RESTART_DELAY = float(os.getenv('CLUSTER_RESTART_DELAY', '5'))  # First wait before restarting a crashed worker
+CLUSTER_RESTART_MAX_DELAY = float(os.getenv('CLUSTER_RESTART_MAX_DELAY', '300'))  # Cap on the doubling restart wait
+LEADER_LEASE_SECONDS = float(os.getenv('LEADER_LEASE_SECONDS', '30'))  # A dead leader is replaced within this long
+NODE_ID = os.getenv('NODE_ID') or f"{socket.gethostname()}:{os.getpid()}"  # This process's name in the leader lease
 
 # Bot setup
 intents = discord.Intents.default()
 intents.message_content = True
 intents.members = True
 intents.guilds = True
-bot = commands.Bot(command_prefix='!', intents=intents)
+if SHARDED:
+    bot = commands.AutoShardedBot(command_prefix='!', intents=intents, shard_count=SHARD_COUNT, shard_ids=SHARD_IDS)
+else:
+    bot = commands.Bot(command_prefix='!', intents=intents)
 
 # ================== DATA MANAGEMENT ==================
 
-def load_data():
-    """Load tracking data"""
+def empty_index():
+    """Fresh resident index"""
+    return {
+        'tracked_channels': {},  # channel_id: {creator_id, guild_id, creator_name}
+        'guild_channels': {},  # guild_id: [channel_id, ...]
+        'guild_creators': {},  # guild_id: [guild_id_creator_id, ...]
+        'guild_keywords': {},  # guild_id: {keywords, word_boundary}, when not the defaults
+        'reminder_state': {},  # guild_id_creator_id: [last post timestamp, last_reminded, dm_closed]
+    }
+
+def empty_data():
+    """Fresh tracking dataset"""
+    return {
+        **empty_index(),
+        'creators': {},  # guild_id_creator_id: creator data
+        'posts': {},    # guild_id_creator_id: post data
+    }
+
+def build_index(tracked_channels, creators, posts):
+    """Resident index with the per-server lists and reminder state derived from scratch"""
+    index = empty_index()
+    index['tracked_channels'] = tracked_channels
+    for channel_id, info in tracked_channels.items():
+        index['guild_channels'].setdefault(info['guild_id'], []).append(channel_id)
+    for unique_key, info in creators.items():
+        index['guild_creators'].setdefault(info['guild_id'], []).append(unique_key)
+        index['reminder_state'][unique_key] = reminder_state(info, posts.get(unique_key))
+    return index
+
+def reminder_state(creator_info, posts):
+    """A creator's reminder_state entry, from their record and PostCalendar"""
+    posted_at = posts.last_post() if posts else None
+    return [
+        posted_at.isoformat() if posted_at else creator_info.get('last_posted'),
+        creator_info.get('last_reminded'),
+        creator_info.get('dm_closed')
+    ]
+
+def empty_guild():
+    """Fresh per-server partition"""
+    return {
+        'creators': {},  # guild_id_creator_id: creator data
+        'posts': {},    # guild_id_creator_id: PostCalendar
+    }
+
+def day_ordinal(date_str):
+    """'YYYY-MM-DD' as a day number"""
+    return date.fromisoformat(date_str).toordinal()
+
+class PostCalendar:
+    """One creator's posting days as a bitmap, plus the time of each post.
+
+    Bit n is set if they posted on day `epoch + n` (a date ordinal), so a
+    count over any window is a shift, a mask and int.bit_count().
+    times[i] is the time of day, in seconds, of the i-th posting day,
+    oldest first; exports and reminders need the actual post time. A
+    daily poster's year is a 365-bit int (76 bytes as a Python object)
+    plus 4 bytes a day of times, about 1.6 KB, instead of a dict per day.
+    The trailing week and month counts are kept in a RollingCounts, built
+    on first read.
+    """
+
+    __slots__ = ('epoch', 'bits', 'times', 'rolling')
+
+    def __init__(self, epoch=None, bits=0, times=()):
+        self.epoch = epoch
+        self.bits = bits
+        self.times = array('I', times)
+        self.rolling = None
+
+    def __contains__(self, day):
+        if self.epoch is None or day < self.epoch:
+            return False
+        return bool((self.bits >> (day - self.epoch)) & 1)
+
+    def __len__(self):
+        return self.bits.bit_count()
+
+    def add(self, day, seconds):
+        """Mark a posting day; False if it was already marked"""
+        if day in self:
+            return False
+        if self.epoch is None:
+            self.epoch = day
+        elif day < self.epoch:
+            self.bits <<= self.epoch - day
+            self.epoch = day
+        offset = day - self.epoch
+        self.times.insert((self.bits & ((1 << offset) - 1)).bit_count(), seconds)  # Posting days before it
+        self.bits |= 1 << offset
+        if self.rolling is not None:
+            self.rolling.add(day)
+        return True
+
+    def week_count(self, today):
+        """Posting days in the 7 days ending today, in O(1)"""
+        return self._rolling(today).week
+
+    def month_count(self, today):
+        """Posting days in the 30 days ending today, in O(1)"""
+        return self._rolling(today).month
+
+    def rolling_consistent(self, today):
+        """Whether the rolling counters agree with the raw history"""
+        rolling = self._rolling(today)
+        return (rolling.week == self.count_between(today - 6, today)
+                and rolling.month == self.count_between(today - 29, today))
+
+    def _rolling(self, today):
+        if self.rolling is None:
+            self.rolling = RollingCounts(self, today)
+        self.rolling.advance(today)
+        return self.rolling
+
+    def count_between(self, first, last=None):
+        """Posting days from `first` to `last` inclusive (open-ended if last is None)"""
+        return self._window(first, last).bit_count()
+
+    def days_between(self, first, last):
+        """Posting days from `first` to `last` inclusive, oldest first"""
+        return self._set_days(self._window(first, last), max(first, self.epoch or 0))
+
+    def _window(self, first, last):
+        """The bits for days `first` to `last`, shifted down so bit 0 is `first` (or epoch, if later)"""
+        if not self.bits:
+            return 0
+        low = max(first - self.epoch, 0)
+        window = self.bits >> low
+        if last is not None:
+            span = last - self.epoch + 1 - low
+            window = window & ((1 << span) - 1) if span > 0 else 0
+        return window
+
+    def last_post(self):
+        """Date and time of the newest post, or None"""
+        if not self.bits:
+            return None
+        day = self.epoch + self.bits.bit_length() - 1
+        return datetime.fromordinal(day) + timedelta(seconds=self.times[-1])
+
+    def streak_ending(self, day):
+        """Consecutive posting days ending on `day`"""
+        if day not in self:
+            return 0
+        offset = day - self.epoch
+        gaps = ~self.bits & ((1 << (offset + 1)) - 1)  # Unposted days up to `day`
+        return offset - gaps.bit_length() + 1
+
+    def items(self):
+        """('YYYY-MM-DD', ISO timestamp) for every posting day, oldest first"""
+        for day, seconds in zip(self._set_days(self.bits, self.epoch), self.times):
+            stamp = datetime.fromordinal(day) + timedelta(seconds=seconds)
+            yield stamp.date().isoformat(), stamp.isoformat()
+
+    @staticmethod
+    def _set_days(bits, day):
+        """Day numbers of the set bits, bit 0 being `day`"""
+        while bits:
+            skip = (bits & -bits).bit_length() - 1
+            day += skip
+            yield day
+            bits >>= skip + 1
+            day += 1
+
+    def to_dict(self):
+        return {'epoch': self.epoch, 'days': format(self.bits, 'x'), 'times': list(self.times)}
+
+    @classmethod
+    def from_dict(cls, raw):
+        """Decode to_dict() output, or the older {'YYYY-MM-DD': {'timestamp': ...}} form"""
+        if 'days' in raw:
+            return cls(raw['epoch'], int(raw['days'], 16), raw['times'])
+        calendar = cls()
+        for date_str, post in raw.items():
+            calendar.add(day_ordinal(date_str), seconds_of_day(post.get('timestamp')))
+        return calendar
+
+class RollingCounts:
+    """Posts in the trailing 7 and 30 days, kept in a ring of daily buckets.
+
+    ring[day % 30] is 1 if they posted that day. The ring only moves
+    forward when a read or a post lands on a later day, dropping the days
+    that fall out of each window, so reads are O(1) however long the
+    history is.
+    """
+
+    __slots__ = ('ring', 'head', 'week', 'month')
+    SPAN = 30
+
+    def __init__(self, calendar, today):
+        self.ring = bytearray(self.SPAN)
+        self.head = today
+        self.week = 0
+        self.month = 0
+        for day in calendar.days_between(today - self.SPAN + 1, today):
+            self._mark(day)
+
+    def advance(self, today):
+        """Roll the windows forward so they end on `today`"""
+        if today <= self.head:
+            return
+        if today - self.head >= self.SPAN:
+            self.ring = bytearray(self.SPAN)
+            self.week = self.month = 0
+        else:
+            for day in range(self.head + 1, today + 1):
+                self.week -= self.ring[(day - 7) % self.SPAN]
+                self.month -= self.ring[day % self.SPAN]
+                self.ring[day % self.SPAN] = 0
+        self.head = today
+
+    def add(self, day):
+        """Count a new posting day"""
+        self.advance(day)
+        if self.head - day < self.SPAN:
+            self._mark(day)
+
+    def _mark(self, day):
+        self.ring[day % self.SPAN] = 1
+        self.month += 1
+        if self.head - day < 7:
+            self.week += 1
+
+def seconds_of_day(timestamp):
+    """Time-of-day part of an ISO timestamp, in seconds"""
     try:
-        with open(DATA_FILE, 'r') as f:
-            return json.load(f)
-    except:
-        return {
-            'tracked_channels': {},  # channel_id: {creator_id, guild_id, creator_name}
-            'creators': {},  # guild_id_creator_id: creator data
-            'posts': {},    # guild_id_creator_id: post data
+        moment = datetime.fromisoformat(timestamp)
+    except (TypeError, ValueError):
+        return 0
+    return moment.hour * 3600 + moment.minute * 60 + moment.second
+
+def encode_partition(partition):
+    """Serializable form of a partition"""
+    return {
+        'creators': partition['creators'],
+        'posts': {key: calendar.to_dict() for key, calendar in partition['posts'].items()},
+    }
+
+def decode_partition(raw):
+    """Partition from encode_partition() output or an older snapshot"""
+    return {
+        'creators': raw['creators'],
+        'posts': {key: PostCalendar.from_dict(posts) for key, posts in raw['posts'].items()},
+    }
+
+def dataset_view(index, partition):
+    """Dataset-shaped view over the resident index and one server's partition"""
+    partition = partition if partition is not None else empty_guild()
+    return {
+        **index,
+        'creators': partition['creators'],
+        'posts': partition['posts'],
+    }
+
+def new_creator(record):
+    """Fresh server-specific creator record"""
+    return {
+        'name': record['creator_name'],
+        'guild_id': record['guild_id'],
+        'guild_name': record['guild_name'],
+        'creator_id': record['creator_id'],
+        'channel_id': record['channel_id'],
+        'joined': record['date'],
+        'total_posts': 0,
+        'current_streak': 0,
+        'best_streak': 0,
+        'last_posted': None,
+        'last_reminded': None,
+        'dm_channel_id': None,  # Their DM channel, once a reminder has opened it
+        'dm_closed': None  # Date a reminder last found their DMs closed
+    }
+
+def add_creator(data, record):
+    """Create the record's creator if new, keeping the guild -> creators index"""
+    unique_key = f"{record['guild_id']}_{record['creator_id']}"
+    if unique_key not in data['creators']:
+        data['creators'][unique_key] = new_creator(record)
+        keys = data['guild_creators'].setdefault(record['guild_id'], [])
+        if unique_key not in keys:
+            keys.append(unique_key)
+    return unique_key
+
+def apply_record(data, record):
+    """Apply one journal record to a tracking dataset.
+
+    Records are idempotent, so replaying a journal over a snapshot that
+    already contains some of them is harmless.
+    """
+    op = record['op']
+    
+    if op == 'setup':
+        channels = data['guild_channels'].setdefault(record['guild_id'], [])
+        if record['channel_id'] not in channels:
+            channels.append(record['channel_id'])
+        data['tracked_channels'][record['channel_id']] = {
+            'creator_id': record['creator_id'],
+            'creator_name': record['creator_name'],
+            'guild_id': record['guild_id'],
+            'guild_name': record['guild_name'],
+            'setup_by': record['setup_by'],
+            'setup_date': record['date']
+        }
+        add_creator(data, record)
+    
+    elif op == 'unsetup':
+        info = data['tracked_channels'].pop(record['channel_id'], None)
+        if info is not None:
+            channels = data['guild_channels'].get(info['guild_id'], [])
+            if record['channel_id'] in channels:
+                channels.remove(record['channel_id'])
+    
+    elif op == 'post':
+        unique_key = add_creator(data, record)
+        today = record['date']
+        posts = data['posts'].setdefault(unique_key, PostCalendar())
+        day = day_ordinal(today)
+        if not posts.add(day, seconds_of_day(record['timestamp'])):
+            return
+        
+        creator = data['creators'][unique_key]
+        creator['total_posts'] += 1
+        creator['last_posted'] = today
+        creator['name'] = record['creator_name']  # Update name in case it changed
+        
+        # Calculate streak straight from the bitmap, so it's right however the days arrived
+        creator['current_streak'] = posts.streak_ending(day)
+        if creator['current_streak'] > creator['best_streak']:
+            creator['best_streak'] = creator['current_streak']
+        data['reminder_state'].setdefault(unique_key, [None, None, None])[0] = posts.last_post().isoformat()
+    
+    elif op == 'keywords':
+        if record['keywords'] is None:
+            data['guild_keywords'].pop(record['guild_id'], None)
+        else:
+            data['guild_keywords'][record['guild_id']] = {
+                'keywords': record['keywords'],
+                'word_boundary': record['word_boundary']
+            }
+    
+    elif op == 'remind':
+        if record['key'] in data['creators']:
+            data['creators'][record['key']]['last_reminded'] = record['date']
+            data['reminder_state'].setdefault(record['key'], [None, None, None])[1] = record['date']
+    
+    elif op == 'dm':
+        if record['key'] in data['creators']:
+            creator = data['creators'][record['key']]
+            creator['dm_channel_id'] = record['channel_id']
+            creator['dm_closed'] = record['closed']
+            data['reminder_state'].setdefault(record['key'], [None, None, None])[2] = record['closed']
+
+def touched_rows(data, record):
+    """Copies of the rows a record changed, safe to hand to the storage thread"""
+    rows = {}
+    if record['op'] in ('setup', 'post'):
+        unique_key = f"{record['guild_id']}_{record['creator_id']}"
+        rows['creator'] = (unique_key, dict(data['creators'][unique_key]))
+    if record['op'] == 'setup':
+        rows['channel'] = dict(data['tracked_channels'][record['channel_id']])
+    if record['op'] == 'post':
+        rows['post'] = {
+            'timestamp': record['timestamp'],
+            'channel': record['channel_name'],
+            'guild': record['guild_name']
         }
+    if record['op'] == 'keywords':
+        settings = data['guild_keywords'].get(record['guild_id'])
+        rows['keywords'] = dict(settings) if settings else None
+    return rows
+
+class JsonSerializer:
+    """Pretty-printed JSON, for exports and debugging"""
+    name = 'json'
+
+    def dumps(self, data):
+        return json.dumps(data, indent=2, default=str).encode()
+
+    def loads(self, raw):
+        return json.loads(raw)
+
+class CompactJsonSerializer:
+    """Minified JSON, through orjson when it's installed"""
+    name = 'compact'
+
+    def dumps(self, data):
+        if orjson:
+            return orjson.dumps(data, default=str)
+        return json.dumps(data, separators=(',', ':'), default=str).encode()
+
+    def loads(self, raw):
+        if orjson:
+            return orjson.loads(raw)
+        return json.loads(raw)
+
+class MsgpackSerializer:
+    """MessagePack binary snapshots (needs the msgpack package)"""
+    name = 'msgpack'
+
+    def dumps(self, data):
+        return msgpack.packb(data, default=str, use_bin_type=True)
+
+    def loads(self, raw):
+        return msgpack.unpackb(raw, raw=False)
+
+SERIALIZERS = {cls.name: cls() for cls in (JsonSerializer, CompactJsonSerializer, MsgpackSerializer)}
+
+def snapshot_serializer():
+    """Serializer for new snapshots, per SNAPSHOT_FORMAT"""
+    if SNAPSHOT_FORMAT == 'msgpack' and msgpack is None:
+        raise RuntimeError("SNAPSHOT_FORMAT=msgpack needs the msgpack package installed")
+    return SERIALIZERS[SNAPSHOT_FORMAT]
+
+def decode_snapshot(raw):
+    """Parse a snapshot in whichever format wrote it.
+
+    JSON (pretty or minified) always starts with '{' or whitespace; a
+    MessagePack map never does.
+    """
+    if raw[:1].isspace() or raw[:1] == b'{':
+        return SERIALIZERS['compact'].loads(raw)
+    if not raw:
+        raise ValueError("empty snapshot")
+    if msgpack is None:
+        raise ValueError("binary snapshot but msgpack isn't installed")
+    return SERIALIZERS['msgpack'].loads(raw)
+
+def write_atomic(path, payload, generations=0):
+    """Replace a file crash-safely: write a temp file, fsync it, rename it over.
+
+    The previous `generations` versions are kept as path.1 (newest) to path.N.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    
+    for n in range(generations, 0, -1):
+        older = path if n == 1 else f"{path}.{n - 1}"
+        if os.path.exists(older):
+            os.replace(older, f"{path}.{n}")
+    os.replace(tmp_path, path)
+    
+    # Make the rename itself durable
+    if os.name == 'posix':
+        dir_fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+def read_newest_valid(path, generations):
+    """Parse path, falling back to path.1 .. path.N if it's missing or corrupt.
+
+    Returns None when no generation exists at all. Raises if generations
+    exist but none of them parse, rather than silently starting empty.
+    """
+    candidates = [path] + [f"{path}.{n}" for n in range(1, generations + 1)]
+    found = []
+    for candidate in candidates:
+        try:
+            with open(candidate, 'rb') as f:
+                data = decode_snapshot(f.read())
+        except FileNotFoundError:
+            continue
+        except ValueError as e:
+            print(f"Skipping corrupt snapshot {candidate}: {e}")
+            found.append(candidate)
+            continue
+        if found or candidate != path:
+            print(f"Recovered tracking data from {candidate}")
+        return data
+    if found:
+        raise RuntimeError(f"No readable snapshot among {', '.join(found)}")
+    return None
+
+class JsonPersistence:
+    """Keeps tracking data as per-server snapshots plus one append-only journal.
+
+    Snapshots are written in SNAPSHOT_FORMAT and read back in whatever
+    format they're in; the .json names predate the format choice.
+    index.json holds the resident index: tracked_channels, the channel ->
+    server routing table, plus server -> channels and server -> creators
+    lists and each creator's reminder state. guilds/<guild_id>.json holds
+    each server's creators and posts, so a server's data loads without
+    parsing anyone else's. Every change is
+    appended to journal.log as one compact line, and load_guild() replays
+    a server's journal lines over its snapshot, so a change can be read
+    back as soon as its append returns. compact() folds the journal into
+    the snapshots it touches straight from disk, never reading the live
+    dataset, so it can run on the storage thread. Appends and compaction
+    take a lock on the journal, so a second copy of the bot sharing
+    DATA_DIR can't lose records to a compaction that's halfway through.
+    leases.json holds the leader lease.
+    """
+
+    def __init__(self, data_dir):
+        self.index_path = os.path.join(data_dir, 'index.json')
+        self.guilds_dir = os.path.join(data_dir, 'guilds')
+        self.journal_path = os.path.join(data_dir, 'journal.log')
+        self.lease_path = os.path.join(data_dir, 'leases.json')
+        self.journal = None
+
+    def load(self):
+        """Load the resident index, first folding any journal left by a crash"""
+        os.makedirs(self.guilds_dir, exist_ok=True)
+        if not os.path.exists(self.index_path) and os.path.exists(DATA_FILE):
+            self._split_legacy()
+        if self.journal is None:
+            self.journal = open(self.journal_path, 'a')
+        self.compact()
+        return self._read_index()
+
+    def load_guild(self, guild_id):
+        """Load one server's partition: its snapshot plus its records still in the journal"""
+        with file_lock(self.journal):
+            partition = self._read_snapshot(guild_id)
+            view = dataset_view(empty_index(), partition)
+            for record in read_journal(self.journal_path):
+                if record.get('guild_id') == guild_id:
+                    apply_record(view, record)
+        return partition
+
+    def _read_snapshot(self, guild_id):
+        raw = read_newest_valid(self._guild_path(guild_id), SNAPSHOT_GENERATIONS)
+        return decode_partition(raw) if raw else empty_guild()
+
+    def guild_ids(self):
+        """Every server with a snapshot on disk"""
+        return [name[:-len('.json')] for name in os.listdir(self.guilds_dir) if name.endswith('.json')]
+
+    def append(self, record, rows):
+        """Append one change to the journal"""
+        self.append_batch([(record, rows)])
+
+    def append_batch(self, batch):
+        """Append several (record, rows) changes to the journal in one write"""
+        with file_lock(self.journal):
+            self.journal.write(''.join(json.dumps(record, separators=(',', ':')) + '\n' for record, rows in batch))
+            self.journal.flush()
+
+    def compact(self):
+        """Fold the journal into the snapshots it touches, then empty it"""
+        with file_lock(self.journal):
+            self._fold_journal()
+
+    def _fold_journal(self):
+        records = read_journal(self.journal_path)
+        if not records:
+            return
+        
+        serializer = snapshot_serializer()
+        index = self._read_index()
+        partitions = {}
+        for record in records:
+            partition = None
+            if 'guild_id' in record:
+                guild_id = record['guild_id']
+                if guild_id not in partitions:
+                    partitions[guild_id] = self._read_snapshot(guild_id)
+                partition = partitions[guild_id]
+            apply_record(dataset_view(index, partition), record)
+        
+        for guild_id, partition in partitions.items():
+            # A crash between writing this snapshot and index.json leaves
+            # creators the replay above finds known, so never re-indexes
+            keys = index['guild_creators'].setdefault(guild_id, [])
+            indexed = set(keys)
+            keys.extend(key for key in partition['creators'] if key not in indexed)
+            write_atomic(self._guild_path(guild_id), serializer.dumps(encode_partition(partition)), SNAPSHOT_GENERATIONS)
+        # Posts, reminders and DMs all move reminder_state, so the index changes with any record
+        write_atomic(self.index_path, serializer.dumps(index), SNAPSHOT_GENERATIONS)
+        self.journal.seek(0)
+        self.journal.truncate()
+
+    def acquire_lease(self, name, holder, seconds):
+        """Take or renew a lease unless another holder's is still live"""
+        with open(self.lease_path, 'a+') as f, file_lock(f):
+            f.seek(0)
+            try:
+                leases = json.loads(f.read() or '{}')
+            except ValueError:
+                leases = {}  # Torn by a crash mid-write; treat every lease as free
+            now = time.time()
+            lease = leases.get(name)
+            if lease and lease['holder'] != holder and lease['expires'] > now:
+                return False
+            leases[name] = {'holder': holder, 'expires': now + seconds}
+            f.truncate(0)
+            f.write(json.dumps(leases))
+            f.flush()
+            return True
+
+    def release_lease(self, name, holder):
+        """Give up a lease early, so a standby needn't wait for it to expire"""
+        with open(self.lease_path, 'a+') as f, file_lock(f):
+            f.seek(0)
+            try:
+                leases = json.loads(f.read() or '{}')
+            except ValueError:
+                return
+            if leases.get(name, {}).get('holder') == holder:
+                del leases[name]
+                f.truncate(0)
+                f.write(json.dumps(leases))
+                f.flush()
+
+    def _guild_path(self, guild_id):
+        return os.path.join(self.guilds_dir, f"{guild_id}.json")
+
+    def _read_index(self):
+        raw = read_newest_valid(self.index_path, SNAPSHOT_GENERATIONS)
+        if raw is None:
+            return empty_index()
+        if 'reminder_state' in raw:
+            return {**empty_index(), **raw}
+        
+        # Older index.json held only tracked_channels, then no reminder
+        # state; derive the per-server lists and reminder state once
+        creators, posts = {}, {}
+        for guild_id in self.guild_ids():
+            partition = self._read_snapshot(guild_id)
+            creators.update(partition['creators'])
+            posts.update(partition['posts'])
+        index = build_index(raw.get('tracked_channels', raw), creators, posts)
+        if 'tracked_channels' in raw:
+            index['guild_keywords'] = raw.get('guild_keywords', {})
+        write_atomic(self.index_path, snapshot_serializer().dumps(index), SNAPSHOT_GENERATIONS)
+        return index
+
+    def _split_legacy(self):
+        """One-time split of the old single-file dataset into per-server snapshots"""
+        data = read_newest_valid(DATA_FILE, SNAPSHOT_GENERATIONS) or empty_data()
+        data['posts'] = {key: PostCalendar.from_dict(posts) for key, posts in data['posts'].items()}
+        data.update(build_index(data['tracked_channels'], data['creators'], data['posts']))
+        for record in read_journal(JOURNAL_FILE):
+            apply_record(data, record)
+        
+        partitions = {}
+        for unique_key, info in data['creators'].items():
+            partitions.setdefault(info['guild_id'], empty_guild())['creators'][unique_key] = info
+        for unique_key, posts in data['posts'].items():
+            guild_id = unique_key.split('_')[0]
+            partitions.setdefault(guild_id, empty_guild())['posts'][unique_key] = posts
+        
+        serializer = snapshot_serializer()
+        for guild_id, partition in partitions.items():
+            write_atomic(self._guild_path(guild_id), serializer.dumps(encode_partition(partition)))
+        write_atomic(self.index_path, serializer.dumps({key: data[key] for key in empty_index()}))
+        print(f"Split {DATA_FILE} into {len(partitions)} server files under {os.path.dirname(self.index_path)}")
+
+@contextmanager
+def file_lock(f):
+    """Hold an exclusive lock on an open file; a no-op without fcntl"""
+    if fcntl is None or f is None:
+        yield f
+        return
+    fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    try:
+        yield f
+    finally:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+def read_journal(path):
+    """Records in a journal file, skipping a torn final line from a crash"""
+    records = []
+    try:
+        with open(path, 'r') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    except FileNotFoundError:
+        pass
+    return records
+
+class SqlitePersistence:
+    """Keeps the tracking dataset in SQLite, one small transaction per change.
+
+    Tables are indexed on guild_id, (guild_id, creator_id) and
+    (unique_key, date), so loading one server's creators and posts is an
+    index range scan instead of a scan over every server's data. Date-window
+    counts come from the loaded PostCalendars, not from queries.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tracked_channels (
+            channel_id TEXT PRIMARY KEY,
+            creator_id TEXT NOT NULL,
+            creator_name TEXT,
+            guild_id TEXT NOT NULL,
+            guild_name TEXT,
+            setup_by TEXT,
+            setup_date TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_channels_guild ON tracked_channels (guild_id);
+
+        CREATE TABLE IF NOT EXISTS creators (
+            unique_key TEXT PRIMARY KEY,
+            guild_id TEXT NOT NULL,
+            creator_id TEXT NOT NULL,
+            name TEXT,
+            guild_name TEXT,
+            channel_id TEXT,
+            joined TEXT,
+            total_posts INTEGER NOT NULL DEFAULT 0,
+            current_streak INTEGER NOT NULL DEFAULT 0,
+            best_streak INTEGER NOT NULL DEFAULT 0,
+            last_posted TEXT,
+            last_reminded TEXT,
+            dm_channel_id TEXT,
+            dm_closed TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_creators_guild ON creators (guild_id);
+        CREATE INDEX IF NOT EXISTS idx_creators_guild_creator ON creators (guild_id, creator_id);
+
+        CREATE TABLE IF NOT EXISTS posts (
+            unique_key TEXT NOT NULL,
+            date TEXT NOT NULL,
+            timestamp TEXT,
+            channel TEXT,
+            guild TEXT
+        );
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_posts_key_date ON posts (unique_key, date);
+
+        CREATE TABLE IF NOT EXISTS guild_keywords (
+            guild_id TEXT PRIMARY KEY,
+            keywords TEXT NOT NULL,
+            word_boundary INTEGER NOT NULL DEFAULT 0
+        );
+
+        CREATE TABLE IF NOT EXISTS leases (
+            name TEXT PRIMARY KEY,
+            holder TEXT NOT NULL,
+            expires REAL NOT NULL
+        );
+    """
+
+    CHANNEL_COLUMNS = ('creator_id', 'creator_name', 'guild_id', 'guild_name', 'setup_by', 'setup_date')
+    CREATOR_COLUMNS = ('guild_id', 'creator_id', 'name', 'guild_name', 'channel_id', 'joined',
+                       'total_posts', 'current_streak', 'best_streak', 'last_posted', 'last_reminded',
+                       'dm_channel_id', 'dm_closed')
+    # What a post or setup changes on an existing row. The reminder columns
+    # belong to remind/dm records: a standby's copies of them are stale
+    POST_COLUMNS = ('name', 'total_posts', 'current_streak', 'best_streak', 'last_posted')
+
+    def __init__(self, path):
+        self.path = path
+        # Only the storage thread uses the connection. Cluster workers share
+        # the file, so a writer waits on another's transaction instead of failing
+        self.db = sqlite3.connect(path, timeout=SQLITE_BUSY_TIMEOUT, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute('PRAGMA journal_mode=WAL')  # Readers don't block the writer, or each other
+        self.db.execute('PRAGMA synchronous=NORMAL')  # Like the journal: survives a crash, skips the fsync per commit
+        self.db.executescript(self.SCHEMA)
+        columns = {row['name'] for row in self.db.execute('PRAGMA table_info(creators)')}
+        for column in ('dm_channel_id', 'dm_closed'):
+            if column not in columns:  # Databases from before DM channels were kept
+                self.db.execute(f'ALTER TABLE creators ADD COLUMN {column} TEXT')
+
+    def load(self):
+        """Load the resident index"""
+        index = empty_index()
+        for row in self.db.execute('SELECT * FROM tracked_channels'):
+            index['tracked_channels'][row['channel_id']] = {col: row[col] for col in self.CHANNEL_COLUMNS}
+            index['guild_channels'].setdefault(row['guild_id'], []).append(row['channel_id'])
+        # Reminder state without building calendars: the newest post is one idx_posts_key_date seek
+        rows = self.db.execute(
+            'SELECT guild_id, unique_key, last_posted, last_reminded, dm_closed, '
+            '(SELECT timestamp FROM posts WHERE posts.unique_key = creators.unique_key '
+            'ORDER BY date DESC LIMIT 1) AS posted_at FROM creators'
+        )
+        for row in rows:
+            index['guild_creators'].setdefault(row['guild_id'], []).append(row['unique_key'])
+            index['reminder_state'][row['unique_key']] = [
+                row['posted_at'] or row['last_posted'], row['last_reminded'], row['dm_closed']
+            ]
+        for row in self.db.execute('SELECT * FROM guild_keywords'):
+            index['guild_keywords'][row['guild_id']] = {
+                'keywords': json.loads(row['keywords']),
+                'word_boundary': bool(row['word_boundary'])
+            }
+        return index
+
+    def load_guild(self, guild_id):
+        """Load one server's partition via idx_creators_guild and idx_posts_key_date"""
+        partition = empty_guild()
+        partition['creators'] = self.guild_creators(guild_id)
+        # Keys are "<guild_id>_<creator_id>" and '`' sorts right after '_'
+        rows = self.db.execute(
+            'SELECT * FROM posts WHERE unique_key >= ? AND unique_key < ? ORDER BY unique_key, date',
+            (f"{guild_id}_", f"{guild_id}`")
+        )
+        for row in rows:
+            calendar = partition['posts'].setdefault(row['unique_key'], PostCalendar())
+            calendar.add(day_ordinal(row['date']), seconds_of_day(row['timestamp']))
+        return partition
+
+    def guild_ids(self):
+        """Every server with stored creators"""
+        return [row[0] for row in self.db.execute('SELECT DISTINCT guild_id FROM creators')]
+
+    def append(self, record, rows):
+        """Write the rows touched by one change in a single transaction"""
+        self.append_batch([(record, rows)])
+
+    def append_batch(self, batch):
+        """Write the rows touched by several (record, rows) changes in one transaction"""
+        with self.db:
+            for record, rows in batch:
+                op = record['op']
+                if 'channel' in rows:
+                    self._put_channel(record['channel_id'], rows['channel'])
+                if 'creator' in rows:
+                    self._put_creator(*rows['creator'], self.POST_COLUMNS)
+                if 'post' in rows:
+                    self._put_post(rows['creator'][0], record['date'], rows['post'])
+                if op == 'unsetup':
+                    self.db.execute('DELETE FROM tracked_channels WHERE channel_id = ?', (record['channel_id'],))
+                elif op == 'keywords':
+                    self._put_keywords(record['guild_id'], rows['keywords'])
+                elif op == 'remind':
+                    self.db.execute(
+                        'UPDATE creators SET last_reminded = ? WHERE unique_key = ?',
+                        (record['date'], record['key'])
+                    )
+                elif op == 'dm':
+                    self.db.execute(
+                        'UPDATE creators SET dm_channel_id = ?, dm_closed = ? WHERE unique_key = ?',
+                        (record['channel_id'], record['closed'], record['key'])
+                    )
+
+    def compact(self):
+        """Nothing to fold: every change is already committed"""
+
+    def acquire_lease(self, name, holder, seconds):
+        """Take or renew a lease unless another holder's is still live, in one statement"""
+        now = time.time()
+        with self.db:
+            self.db.execute(
+                'INSERT INTO leases (name, holder, expires) VALUES (?, ?, ?) '
+                'ON CONFLICT (name) DO UPDATE SET holder = excluded.holder, expires = excluded.expires '
+                'WHERE leases.holder = excluded.holder OR leases.expires <= ?',
+                (name, holder, now + seconds, now)
+            )
+        row = self.db.execute('SELECT holder FROM leases WHERE name = ?', (name,)).fetchone()
+        return row['holder'] == holder
+
+    def release_lease(self, name, holder):
+        """Give up a lease early, so a standby needn't wait for it to expire"""
+        with self.db:
+            self.db.execute('DELETE FROM leases WHERE name = ? AND holder = ?', (name, holder))
+
+    def replace_all(self, data):
+        """Overwrite the database with a whole tracking dataset"""
+        with self.db:
+            self.db.execute('DELETE FROM tracked_channels')
+            self.db.execute('DELETE FROM creators')
+            self.db.execute('DELETE FROM posts')
+            self.db.execute('DELETE FROM guild_keywords')
+            for channel_id, info in data['tracked_channels'].items():
+                self._put_channel(channel_id, info)
+            for guild_id, settings in data['guild_keywords'].items():
+                self._put_keywords(guild_id, settings)
+            for unique_key, info in data['creators'].items():
+                self._put_creator(unique_key, info)
+            for unique_key, calendar in data['posts'].items():
+                for date_str, timestamp in calendar.items():
+                    self._put_post(unique_key, date_str, {'timestamp': timestamp})
+
+    def guild_creators(self, guild_id):
+        """Creator records for one server, via idx_creators_guild"""
+        rows = self.db.execute('SELECT * FROM creators WHERE guild_id = ?', (guild_id,))
+        return {row['unique_key']: {col: row[col] for col in self.CREATOR_COLUMNS} for row in rows}
+
+    def _put_channel(self, channel_id, info):
+        self.db.execute(
+            'INSERT OR REPLACE INTO tracked_channels VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (channel_id, *(info.get(col) for col in self.CHANNEL_COLUMNS))
+        )
+
+    def _put_creator(self, unique_key, info, columns=CREATOR_COLUMNS):
+        """Insert a creator row, or update only `columns` of an existing one"""
+        self.db.execute(
+            f"INSERT INTO creators (unique_key, {', '.join(self.CREATOR_COLUMNS)}) "
+            f"VALUES ({', '.join('?' * (len(self.CREATOR_COLUMNS) + 1))}) "
+            f"ON CONFLICT (unique_key) DO UPDATE SET {', '.join(f'{col} = excluded.{col}' for col in columns)}",
+            (unique_key, *(info.get(col) for col in self.CREATOR_COLUMNS))
+        )
+
+    def _put_post(self, unique_key, date, post):
+        self.db.execute(
+            'INSERT OR IGNORE INTO posts VALUES (?, ?, ?, ?, ?)',
+            (unique_key, date, post.get('timestamp'), post.get('channel'), post.get('guild'))
+        )
+
+    def _put_keywords(self, guild_id, settings):
+        if settings is None:
+            self.db.execute('DELETE FROM guild_keywords WHERE guild_id = ?', (guild_id,))
+            return
+        self.db.execute(
+            'INSERT OR REPLACE INTO guild_keywords VALUES (?, ?, ?)',
+            (guild_id, json.dumps(settings['keywords']), int(settings['word_boundary']))
+        )
+
+def open_persistence():
+    """Storage backend selected by STORAGE_BACKEND"""
+    if STORAGE_BACKEND == 'sqlite':
+        return SqlitePersistence(SQLITE_FILE)
+    return JsonPersistence(DATA_DIR)
+
+def load_everything(persistence):
+    """The whole dataset from any backend, in the old single-file shape"""
+    data = empty_data()
+    data.update(persistence.load())
+    for guild_id in persistence.guild_ids():
+        partition = persistence.load_guild(guild_id)
+        data['creators'].update(partition['creators'])
+        data['posts'].update(partition['posts'])
+    return data
+
+def export_json(path):
+    """Write the whole dataset as one pretty-printed JSON file"""
+    data = load_everything(open_persistence())
+    data['posts'] = {
+        unique_key: {date_str: {'timestamp': timestamp} for date_str, timestamp in calendar.items()}
+        for unique_key, calendar in data['posts'].items()
+    }
+    with open(path, 'wb') as f:
+        f.write(SERIALIZERS['json'].dumps(data))
+    print(f"Exported {len(data['creators'])} creators to {path}")
 
-def save_data(data):
-    """Save tracking data"""
-    with open(DATA_FILE, 'w') as f:
-        json.dump(data, f, indent=2, default=str)
+def import_json_to_sqlite():
+    """One-shot copy of the JSON snapshots and journal into SQLITE_FILE"""
+    data = load_everything(JsonPersistence(DATA_DIR))
+    SqlitePersistence(SQLITE_FILE).replace_all(data)
+    print(f"Imported {len(data['tracked_channels'])} channels, {len(data['creators'])} creators "
+          f"and {sum(len(p) for p in data['posts'].values())} post days into {SQLITE_FILE}")
+
+# One worker thread does all storage I/O, so writes run in submission order
+# and never interleave, and parsing/serializing never blocks the event loop.
+storage_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='storage')
+
+class TrackingStore:
+    """Process-resident tracking data, served from memory and loaded per server.
+
+    The index (tracked_channels, server -> channels and server -> creators
+    lists, and each creator's reminder state) is loaded once at startup
+    and stays resident, so on_message can route a message, per-server
+    commands can find their channels, and reminders can be scheduled,
+    without touching any other server's data. tracked_ids mirrors
+    the tracked channel IDs as a frozenset of ints, so on_message can pass
+    messages from untracked channels straight to command handling. Each
+    server's creators and posts are loaded on first use and dropped again
+    after GUILD_IDLE_TIMEOUT idle seconds, once all of their changes have
+    been written, since loading reads back everything written.
+
+    Handlers change data only through record(), which applies the change in
+    memory, tells the listeners, and queues its journal append on the
+    storage thread. Appends queued while a write is in flight go out
+    together in the next one, so a busy process commits many records per
+    transaction instead of one each. Handlers that check the data and then
+    record a change hold lock(guild_id) across both, so awaits in between
+    can't let another coroutine act on the same stale state; other servers
+    aren't blocked. A background compactor folds the journal into the
+    snapshots at most every COMPACT_INTERVAL seconds, or as soon as
+    COMPACT_MAX_RECORDS records have piled up.
+    """
+
+    def __init__(self, persistence):
+        self.persistence = persistence
+        self.index = empty_index()
+        self.channels = self.index['tracked_channels']  # channel_id: {creator_id, guild_id, creator_name, ...}
+        self.tracked_ids = frozenset()  # int channel IDs, rebuilt on setup/unsetup
+        self.guilds = {}  # guild_id: loaded partition
+        self.loading = {}  # guild_id: in-flight load
+        self.last_access = {}  # guild_id: monotonic time of last use
+        self.last_record = {}  # guild_id: sequence number of its newest record
+        self.locks = {}  # guild_id: asyncio.Lock held across check-then-record sequences
+        self.listeners = []  # Called with each record after it's applied
+        self.unload_listeners = []  # Called with a guild_id when its partition is dropped
+        self.queued = []  # (record, rows) waiting for the next journal write
+        self.waiters = []  # Futures resolved once the queued entries are written
+        self.writer = None  # Task writing queued entries, while there are any
+        self.seq = 0
+        self.written_seq = 0  # Every record up to this one is in storage
+        self.pending = 0  # Journal records since the last snapshot
+        self.dirty_since = None
+        self.compacting = True  # False on a standby; the leader folds the shared journal
+        self.stats = {'records': 0, 'compactions': 0, 'coalesced_writes': 0, 'journal_writes': 0,
+                      'guild_loads': 0, 'guild_evictions': 0, 'fast_rejects': 0}
+
+    async def load(self):
+        """Read the resident index on the storage thread"""
+        self.index = await self._run(self.persistence.load)
+        self.channels = self.index['tracked_channels']
+        self.refresh_tracked()
+
+    def refresh_tracked(self):
+        """Rebuild the tracked channel ID set from the index"""
+        self.tracked_ids = frozenset(int(channel_id) for channel_id in self.channels)
+
+    async def reload(self):
+        """Re-read the storage, picking up what other processes sharing it wrote"""
+        await self.compact()
+        await self.load()  # The JSON backend folds the shared journal first
+        for guild_id in list(self.guilds):
+            self._unload(guild_id)
+
+    async def guild(self, guild_id):
+        """One server's partition, loaded on first access"""
+        self.last_access[guild_id] = time.monotonic()
+        partition = self.guilds.get(guild_id)
+        if partition is None:
+            if guild_id not in self.loading:
+                self.loading[guild_id] = self._run(self.persistence.load_guild, guild_id)
+                self.stats['guild_loads'] += 1
+            try:
+                loaded = await self.loading[guild_id]
+            finally:
+                self.loading.pop(guild_id, None)  # A failed load is retried on next access
+            partition = self.guilds.setdefault(guild_id, loaded)
+        return partition
+
+    def lock(self, guild_id):
+        """The lock serializing check-then-record sequences in one server"""
+        lock = self.locks.get(guild_id)
+        if lock is None:
+            lock = self.locks[guild_id] = asyncio.Lock()
+        return lock
+
+    def guild_ids(self):
+        """Every server with creators, loaded or not"""
+        return [guild_id for guild_id, keys in self.index['guild_creators'].items() if keys]
+
+    def guild_channel_ids(self, guild_id):
+        """Tracked channel IDs in one server"""
+        return self.index['guild_channels'].get(guild_id, [])
+
+    def creator_keys(self, guild_id):
+        """Creator keys in one server"""
+        return self.index['guild_creators'].get(guild_id, [])
+
+    def reminder_state(self, unique_key):
+        """A creator's [last post timestamp, last_reminded, dm_closed], loaded or not"""
+        return self.index['reminder_state'].get(unique_key)
+
+    async def record(self, record):
+        """Apply a change and journal it, compacting if the journal is long"""
+        partition = await self.guild(record['guild_id']) if 'guild_id' in record else None
+        rows = self._apply(record, partition)
+        await self._append([(record, rows)])
+        if self.compacting and self.pending >= COMPACT_MAX_RECORDS:
+            await self.compact()
+
+    async def record_many(self, records):
+        """Apply several changes and journal them in one write"""
+        # Load first, so applying and queueing the batch has no await in between
+        partitions = {}
+        for record in records:
+            if 'guild_id' in record and record['guild_id'] not in partitions:
+                partitions[record['guild_id']] = await self.guild(record['guild_id'])
+        batch = [(record, self._apply(record, partitions.get(record.get('guild_id')))) for record in records]
+        if batch:
+            await self._append(batch)
+        if self.compacting and self.pending >= COMPACT_MAX_RECORDS:
+            await self.compact()
+
+    def _apply(self, record, partition):
+        """Apply a change in memory and return the rows it touched"""
+        view = dataset_view(self.index, partition)
+        apply_record(view, record)
+        if record['op'] in ('setup', 'unsetup'):
+            self.refresh_tracked()
+        rows = touched_rows(view, record)
+        for listener in self.listeners:
+            listener(record)
+        self.seq += 1
+        if 'guild_id' in record:
+            self.last_record[record['guild_id']] = self.seq
+        if not self.pending:
+            self.dirty_since = time.monotonic()
+        self.pending += 1
+        self.stats['records'] += 1
+        return rows
+
+    async def _append(self, batch):
+        """Journal entries, sharing a write with any others queued meanwhile"""
+        done = asyncio.get_running_loop().create_future()
+        self.queued.extend(batch)
+        self.waiters.append(done)
+        if self.writer is None:
+            self.writer = asyncio.ensure_future(self._write_queued())
+        await done
+
+    async def _write_queued(self):
+        while self.queued:
+            batch, self.queued = self.queued, []
+            waiters, self.waiters = self.waiters, []
+            seq = self.seq  # Records are queued as they're applied, so this batch ends here
+            try:
+                await self._run(self.persistence.append_batch, batch)
+            except Exception as e:
+                for done in waiters:
+                    if not done.done():
+                        done.set_exception(e)
+            else:
+                self.written_seq = max(self.written_seq, seq)
+                for done in waiters:
+                    if not done.done():
+                        done.set_result(None)
+            self.stats['journal_writes'] += 1
+        self.writer = None
+
+    async def acquire_lease(self, name, holder, seconds):
+        """Take or renew a lease in the storage; True if `holder` has it"""
+        return await self._run(self.persistence.acquire_lease, name, holder, seconds)
+
+    async def maybe_compact(self):
+        """Compact if the oldest journal record has waited COMPACT_INTERVAL"""
+        if self.compacting and self.pending and time.monotonic() - self.dirty_since >= COMPACT_INTERVAL:
+            await self.compact()
+
+    async def compact(self):
+        """Fold the journal into fresh snapshots"""
+        while self.writer is not None:  # The snapshot must cover everything applied so far
+            await asyncio.shield(self.writer)
+        if not self.pending:
+            return
+        folded, self.pending, self.dirty_since = self.pending, 0, None
+        await self._run(self.persistence.compact)
+        self.stats['compactions'] += 1
+        self.stats['coalesced_writes'] += folded - 1
+
+    def check_rolling_counters(self):
+        """Keys of loaded creators whose rolling counters disagree with their history"""
+        today = datetime.now().toordinal()
+        return [
+            unique_key
+            for partition in self.guilds.values()
+            for unique_key, calendar in partition['posts'].items()
+            if not calendar.rolling_consistent(today)
+        ]
+
+    def evict_idle(self):
+        """Unload servers idle for GUILD_IDLE_TIMEOUT whose changes are all written"""
+        cutoff = time.monotonic() - GUILD_IDLE_TIMEOUT
+        for guild_id, last_used in list(self.last_access.items()):
+            if last_used <= cutoff:
+                self._unload(guild_id)
+
+    def _unload(self, guild_id):
+        """Drop one server's partition, unless it's mid-load, locked or has unwritten changes"""
+        if guild_id in self.loading:
+            return
+        if guild_id in self.locks and self.locks[guild_id].locked():
+            return
+        if self.last_record.get(guild_id, 0) > self.written_seq:
+            return  # A change of its is still queued for the storage thread
+        self.guilds.pop(guild_id, None)
+        self.last_access.pop(guild_id, None)
+        self.last_record.pop(guild_id, None)
+        self.locks.pop(guild_id, None)
+        for listener in self.unload_listeners:
+            listener(guild_id)
+        self.stats['guild_evictions'] += 1
+
+    def close(self):
+        """Finish queued writes and, on the leader, leave a fresh snapshot behind"""
+        storage_executor.shutdown(wait=True)
+        if self.queued:  # Left behind when the event loop stopped mid-write
+            self.persistence.append_batch(self.queued)
+            self.queued = []
+        if self.compacting and self.pending:
+            self.persistence.compact()
+
+    def _run(self, func, *args):
+        return asyncio.get_running_loop().run_in_executor(storage_executor, func, *args)
+
+store = TrackingStore(open_persistence())
+
+# ================== SHARDING ==================
+
+def guild_shard(guild_id):
+    """The shard a server's events arrive on, as Discord assigns them"""
+    if not bot.shard_count:
+        return 0
+    return (int(guild_id) >> 22) % bot.shard_count
+
+def owns_guild(guild_id):
+    """Whether this process runs the shard for a server"""
+    shard_ids = getattr(bot, 'shard_ids', None)
+    if not bot.shard_count or shard_ids is None:
+        return True
+    return guild_shard(guild_id) in shard_ids
+
+def owned_guild_ids():
+    """Stored servers on this process's shards, for background scans"""
+    return [guild_id for guild_id in store.guild_ids() if owns_guild(guild_id)]
+
+class ShardStats:
+    """Messages seen per shard.
+
+    Counting is a bare increment, since it runs on every message; rates
+    are worked out when read, over the time since the previous reading at
+    least WINDOW seconds ago.
+    """
+
+    WINDOW = 60
+
+    def __init__(self):
+        self.totals = {}  # shard_id: messages seen
+        self.previous = (time.monotonic(), {})  # (time, totals) reading the rates are measured from
+        self.latest = self.previous
+
+    def count(self, shard_id):
+        self.totals[shard_id] = self.totals.get(shard_id, 0) + 1
+
+    def per_minute(self, shard_id):
+        """Recent messages per minute on a shard"""
+        now = time.monotonic()
+        if now - self.latest[0] >= self.WINDOW:
+            self.previous, self.latest = self.latest, (now, dict(self.totals))
+        since, totals = self.previous
+        elapsed = max(now - since, 1)
+        return (self.totals.get(shard_id, 0) - totals.get(shard_id, 0)) * 60 / elapsed
+
+    def total(self, shard_id):
+        return self.totals.get(shard_id, 0)
+
+shard_stats = ShardStats()
+
+# ================== LEADER ELECTION ==================
+
+class LeaderLease:
+    """Lease-based leader election over the storage backend.
+
+    Copies of the bot sharing storage for availability race for one lease
+    per shard set (a lease row in SQLite, leases.json next to the JSON
+    data). The holder renews it every third of LEADER_LEASE_SECONDS and
+    is the only copy that sends reminders or compacts; if it dies, a
+    standby takes the lease once it expires, within LEADER_LEASE_SECONDS.
+    A leader whose renewals stall stops counting itself as leader when its
+    own lease would have run out, before anyone else can take it over.
+    """
+
+    def __init__(self, holder=NODE_ID, seconds=LEADER_LEASE_SECONDS):
+        shards = ','.join(map(str, SHARD_IDS)) if SHARD_IDS else 'all'
+        self.name = f"leader:{shards}"
+        self.holder = holder
+        self.seconds = seconds
+        self.leading = False  # Leadership as last acted on by elect_leader
+        self.expires = 0.0  # Monotonic time our lease runs out, as far as we know
+
+    def is_leader(self):
+        """Whether this process holds an unexpired lease"""
+        return time.monotonic() < self.expires
+
+    async def heartbeat(self):
+        """Take or renew the lease; returns 'elected' or 'deposed' when leadership changes"""
+        started = time.monotonic()
+        try:
+            if await store.acquire_lease(self.name, self.holder, self.seconds):
+                self.expires = started + self.seconds  # Written after `started`, so good until at least then
+            else:
+                self.expires = 0.0
+        except Exception as e:
+            print(f"Couldn't renew the leader lease: {e}")  # Still leader until it runs out
+        if self.is_leader() == self.leading:
+            return None
+        self.leading = not self.leading
+        return 'elected' if self.leading else 'deposed'
+
+    def release(self):
+        """Hand the lease back at shutdown, so a standby needn't wait for it to expire"""
+        if self.is_leader():
+            self.expires = 0.0
+            store.persistence.release_lease(self.name, self.holder)
+
+leader = LeaderLease()
+
+# ================== POST DETECTION ==================
+
+POST_KEYWORDS = ['posted', 'done', 'uploaded', 'posted for today', 'posted today']
+
+# Ready-made keyword sets servers can add with !keywords lang <code>
+KEYWORD_LANGUAGES = {
+    'en': ['posted', 'done', 'uploaded'],
+    'es': ['publicado', 'subido', 'listo', 'hecho'],
+    'pt': ['postado', 'publicado', 'pronto', 'feito'],
+    'fr': ['posté', 'publié', 'fait'],
+    'de': ['gepostet', 'hochgeladen', 'erledigt', 'fertig'],
+}
+
+def compile_keywords(keywords, word_boundary=False):
+    """One regex that finds any of the keywords in lowercased text.
+
+    Searching a lowercased copy is several times faster than re.IGNORECASE
+    on long messages. Without word boundaries a keyword containing a shorter one ('posted
+    today' vs 'posted') can never be the only match, so it's dropped.
+    """
+    words = sorted({keyword.lower() for keyword in keywords if keyword.strip()}, key=len, reverse=True)
+    if not word_boundary:
+        words = [word for word in words if not any(other != word and other in word for other in words)]
+    if not words:
+        return re.compile(r'(?!)')  # Matches nothing
+    pattern = '|'.join(re.escape(word) for word in words)
+    if word_boundary:
+        pattern = rf'\b(?:{pattern})\b'
+    return re.compile(pattern)
+
+DEFAULT_MATCHER = compile_keywords(POST_KEYWORDS)
+keyword_matchers = {}  # guild_id: compiled matcher for servers with their own keywords
+
+def keyword_settings(guild_id):
+    """(keywords, word_boundary) in effect for a server"""
+    settings = store.index['guild_keywords'].get(guild_id)
+    if settings is None:
+        return POST_KEYWORDS, False
+    return settings['keywords'], settings['word_boundary']
+
+def is_post_message(guild_id, content):
+    """Whether a message's first KEYWORD_SCAN_CHARS characters contain a post keyword"""
+    matcher = keyword_matchers.get(guild_id)
+    if matcher is None:
+        if guild_id in store.index['guild_keywords']:
+            matcher = keyword_matchers[guild_id] = compile_keywords(*keyword_settings(guild_id))
+        else:
+            matcher = DEFAULT_MATCHER
+    return matcher.search(content[:KEYWORD_SCAN_CHARS].lower()) is not None
+
+def update_keyword_matcher(record):
+    """Store listener dropping a server's matcher when its keywords change"""
+    if record['op'] == 'keywords':
+        keyword_matchers.pop(record['guild_id'], None)
+
+store.listeners.append(update_keyword_matcher)
 
 # ================== BOT EVENTS ==================
 
+@bot.event
+async def setup_hook():
+    await store.load()
+    elect_leader.start()
+    # bot.run only stops cleanly on Ctrl-C; close on SIGTERM too (sent by
+    # --cluster and service managers), so the store is flushed and the
+    # leader lease handed back instead of left to expire
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, lambda: asyncio.ensure_future(bot.close()))
+    except NotImplementedError:
+        pass  # Windows
+
 @bot.event
 async def on_ready():
     print(f"""
@@ -55,6 +1449,7 @@ async def on_ready():
     
     Logged in as: {bot.user}
     Active in {len(bot.guilds)} servers
+    Shards: {', '.join(map(str, getattr(bot, 'shard_ids', None) or range(bot.shard_count or 1)))} of {bot.shard_count or 1}
     
     Commands:
     !setup @creator - Setup in this channel
@@ -62,100 +1457,77 @@ async def on_ready():
     !stats @user - Individual stats for this server
     """)
     
-    # Start background tasks
-    check_reminders.start()
+    # Start background tasks; elect_leader starts reminders on the leader
+    if not compact_store.is_running():
+        compact_store.start()
+    if not verify_rolling_counters.is_running():
+        verify_rolling_counters.start()
 
 @bot.event
 async def on_message(message):
     """Track posted messages in registered channels"""
+    shard_stats.count(message.guild.shard_id if message.guild else 0)
     
     # Ignore bot messages
     if message.author.bot:
         return
     
-    # Ignore DMs
+    # Ignore DMs, commands included: they all work on the current server
     if not message.guild:
         return
     
-    data = load_data()
+    # Untracked channels skip straight to command handling
+    if message.channel.id not in store.tracked_ids:
+        store.stats['fast_rejects'] += 1
+        await bot.process_commands(message)
+        return
     
     # Get server and channel IDs
     guild_id = str(message.guild.id)
     channel_id = str(message.channel.id)
     
     # Check if this channel is being tracked
-    if channel_id in data['tracked_channels']:
+    if channel_id in store.channels:
         # Check for posted message
-        posted_keywords = ['posted', 'done', 'uploaded', 'posted for today', 'posted today']
-        
-        if any(keyword in message.content.lower() for keyword in posted_keywords):
+        if is_post_message(guild_id, message.content):
             
             # Get the creator info for this channel
-            channel_data = data['tracked_channels'][channel_id]
+            channel_data = store.channels[channel_id]
             creator_id = channel_data['creator_id']
             creator_name = channel_data['creator_name']
             
             # Create unique key for this server+creator combination
             unique_key = f"{guild_id}_{creator_id}"
             
-            today = datetime.now().strftime('%Y-%m-%d')
-            timestamp = datetime.now().isoformat()
-            
-            # Initialize creator if new (server-specific)
-            if unique_key not in data['creators']:
-                data['creators'][unique_key] = {
-                    'name': creator_name,
-                    'guild_id': guild_id,
-                    'guild_name': message.guild.name,
-                    'creator_id': creator_id,
-                    'channel_id': channel_id,
-                    'joined': today,
-                    'total_posts': 0,
-                    'current_streak': 0,
-                    'best_streak': 0,
-                    'last_posted': None,
-                    'last_reminded': None
-                }
+            now = datetime.now()
+            today = now.strftime('%Y-%m-%d')
+            timestamp = now.isoformat()
             
-            # Check if already posted today
-            if unique_key not in data['posts']:
-                data['posts'][unique_key] = {}
+            # Check if already posted today and record the post as one step
+            async with store.lock(guild_id):
+                data = await store.guild(guild_id)
+                is_new = now.toordinal() not in data['posts'].get(unique_key, PostCalendar())
+                if is_new:
+                    await store.record({
+                        'op': 'post',
+                        'guild_id': guild_id,
+                        'guild_name': message.guild.name,
+                        'creator_id': creator_id,
+                        'creator_name': creator_name,
+                        'channel_id': channel_id,
+                        'channel_name': message.channel.name,
+                        'date': today,
+                        'timestamp': timestamp
+                    })
+                    current = data['creators'][unique_key]['current_streak']
+                    week_count = get_posts_in_period(unique_key, 7)
+                    month_count = get_posts_in_period(unique_key, 30)
             
-            if today not in data['posts'][unique_key]:
-                # Record the post
-                data['posts'][unique_key][today] = {
-                    'timestamp': timestamp,
-                    'channel': message.channel.name,
-                    'guild': message.guild.name
-                }
-                
-                # Update creator stats
-                data['creators'][unique_key]['total_posts'] += 1
-                data['creators'][unique_key]['last_posted'] = today
-                data['creators'][unique_key]['name'] = creator_name  # Update name in case it changed
-                
-                # Calculate streak
-                yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
-                if yesterday in data['posts'][unique_key]:
-                    data['creators'][unique_key]['current_streak'] += 1
-                else:
-                    data['creators'][unique_key]['current_streak'] = 1
-                
-                # Update best streak
-                current = data['creators'][unique_key]['current_streak']
-                best = data['creators'][unique_key]['best_streak']
-                if current > best:
-                    data['creators'][unique_key]['best_streak'] = current
-                
-                save_data(data)
-                
+            if is_new:
                 # React to confirm
                 await message.add_reaction('✅')
                 
                 # Send confirmation
-                week_count = get_posts_in_period(unique_key, 7)
-                month_count = get_posts_in_period(unique_key, 30)
-                
                 embed = discord.Embed(
                     title="✅ Post Tracked!",
                     color=discord.Color.green()
@@ -180,54 +1552,35 @@ async def on_message(message):
 @commands.has_permissions(manage_channels=True)
 async def setup_channel(ctx, member: discord.Member):
     """Setup tracking for a creator in this channel (server-specific)"""
-    data = load_data()
-    
     channel_id = str(ctx.channel.id)
     creator_id = str(member.id)
     guild_id = str(ctx.guild.id)
     
-    # Check if channel already tracked
-    if channel_id in data['tracked_channels']:
-        current_creator = data['tracked_channels'][channel_id]['creator_name']
+    async with store.lock(guild_id):
+        # Check if channel already tracked
+        current = store.channels.get(channel_id)
+        if current is None:
+            # Setup the channel with server info
+            await store.record({
+                'op': 'setup',
+                'channel_id': channel_id,
+                'creator_id': creator_id,
+                'creator_name': member.name,
+                'guild_id': guild_id,
+                'guild_name': ctx.guild.name,
+                'setup_by': str(ctx.author.id),
+                'date': datetime.now().strftime('%Y-%m-%d')
+            })
+    
+    if current is not None:
         embed = discord.Embed(
             title="Channel Already Setup",
-            description=f"This channel is tracking **{current_creator}**\nUse `!unsetup` first to change.",
+            description=f"This channel is tracking **{current['creator_name']}**\nUse `!unsetup` first to change.",
             color=discord.Color.orange()
         )
         await ctx.send(embed=embed)
         return
     
-    # Setup the channel with server info
-    data['tracked_channels'][channel_id] = {
-        'creator_id': creator_id,
-        'creator_name': member.name,
-        'guild_id': guild_id,
-        'guild_name': ctx.guild.name,
-        'setup_by': str(ctx.author.id),
-        'setup_date': datetime.now().strftime('%Y-%m-%d')
-    }
-    
-    # Create unique key for this server+creator
-    unique_key = f"{guild_id}_{creator_id}"
-    
-    # Initialize creator if needed (server-specific)
-    if unique_key not in data['creators']:
-        data['creators'][unique_key] = {
-            'name': member.name,
-            'guild_id': guild_id,
-            'guild_name': ctx.guild.name,
-            'creator_id': creator_id,
-            'channel_id': channel_id,
-            'joined': datetime.now().strftime('%Y-%m-%d'),
-            'total_posts': 0,
-            'current_streak': 0,
-            'best_streak': 0,
-            'last_posted': None,
-            'last_reminded': None
-        }
-    
-    save_data(data)
-    
     embed = discord.Embed(
         title="✅ Channel Setup Complete!",
         description=f"Now tracking **{member.name}** in this channel\nServer: **{ctx.guild.name}**",
@@ -250,19 +1603,16 @@ async def setup_channel(ctx, member: discord.Member):
 @commands.has_permissions(manage_channels=True)
 async def unsetup_channel(ctx):
     """Remove tracking from this channel"""
-    data = load_data()
-    
     channel_id = str(ctx.channel.id)
     
-    if channel_id not in data['tracked_channels']:
+    if channel_id not in store.channels:
         await ctx.send("This channel isn't being tracked.")
         return
     
-    creator_name = data['tracked_channels'][channel_id]['creator_name']
+    creator_name = store.channels[channel_id]['creator_name']
     
     # Remove channel from tracking
-    del data['tracked_channels'][channel_id]
-    save_data(data)
+    await store.record({'op': 'unsetup', 'channel_id': channel_id})
     
     embed = discord.Embed(
         title="✅ Tracking Removed",
@@ -276,13 +1626,12 @@ async def unsetup_channel(ctx):
 @commands.has_permissions(manage_channels=True)
 async def list_channels(ctx):
     """List all tracked channels IN THIS SERVER"""
-    data = load_data()
     guild_id = str(ctx.guild.id)
+    data = await store.guild(guild_id)
     
-    # Filter channels for this server only
+    # Channels for this server, straight from the guild index
     server_channels = {
-        ch_id: info for ch_id, info in data['tracked_channels'].items()
-        if info.get('guild_id') == guild_id
+        ch_id: store.channels[ch_id] for ch_id in store.guild_channel_ids(guild_id)
     }
     
     if not server_channels:
@@ -312,156 +1661,749 @@ async def list_channels(ctx):
     
     await ctx.send(embed=embed)
 
+@bot.command(name='keywords')
+@commands.has_permissions(manage_channels=True)
+async def post_keywords(ctx, action: str = None, *, value: str = None):
+    """Show or change the words that count as a post in this server"""
+    guild_id = str(ctx.guild.id)
+    words = [word.strip().lower() for word in (value or '').split(',') if word.strip()]
+    action = (action or '').lower()
+    
+    # Read, change and record the settings as one step, so concurrent edits don't drop each other
+    async with store.lock(guild_id):
+        keywords, word_boundary = keyword_settings(guild_id)
+        if action == 'set' and words:
+            keywords = words
+        elif action == 'add' and words:
+            keywords = keywords + [word for word in words if word not in keywords]
+        elif action == 'remove' and words:
+            keywords = [word for word in keywords if word not in words]
+        elif action == 'lang' and value and value.lower() in KEYWORD_LANGUAGES:
+            keywords = keywords + [word for word in KEYWORD_LANGUAGES[value.lower()] if word not in keywords]
+        elif action == 'boundary' and value and value.lower() in ('on', 'off'):
+            word_boundary = value.lower() == 'on'
+        elif action == 'reset':
+            keywords = None
+        elif action:
+            await ctx.send("Usage: `!keywords [set|add|remove] word, word` · `!keywords lang "
+                           f"{'|'.join(KEYWORD_LANGUAGES)}` · `!keywords boundary on|off` · `!keywords reset`")
+            return
+        
+        if action:
+            if keywords is not None and not keywords:
+                await ctx.send("At least one keyword is needed. Use `!keywords reset` for the defaults.")
+                return
+            await store.record({
+                'op': 'keywords',
+                'guild_id': guild_id,
+                'keywords': keywords,
+                'word_boundary': word_boundary
+            })
+            keywords, word_boundary = keyword_settings(guild_id)
+    
+    embed = discord.Embed(
+        title=f"🔤 Post Keywords in {ctx.guild.name}",
+        description=", ".join(f"`{word}`" for word in keywords),
+        color=discord.Color.blue()
+    )
+    embed.add_field(name="Whole words only", value="On" if word_boundary else "Off", inline=True)
+    embed.set_footer(text=f"Checked in the first {KEYWORD_SCAN_CHARS} characters of each message")
+    
+    await ctx.send(embed=embed)
+
 # ================== TRACKING FUNCTIONS ==================
 
 def get_posts_in_period(unique_key: str, days: int) -> int:
     """Get number of posts in last X days for a specific server+creator"""
-    data = load_data()
-    count = 0
+    # Callers have already loaded this server's partition
+    data = store.guilds.get(unique_key.split('_')[0], empty_guild())
+    calendar = data['posts'].get(unique_key)
+    if calendar is None:
+        return 0
     
-    if unique_key in data['posts']:
-        cutoff = datetime.now() - timedelta(days=days)
+    # Days whose midnight falls within the last X days, i.e. today and the X-1 before it
+    today = datetime.now().toordinal()
+    if days == 7:
+        return calendar.week_count(today)
+    if days == 30:
+        return calendar.month_count(today)
+    return calendar.count_between(today - days + 1)
+
+def get_posts_between(unique_key: str, first: date, last: date) -> int:
+    """Get number of posts from `first` to `last` inclusive for a specific server+creator"""
+    data = store.guilds.get(unique_key.split('_')[0], empty_guild())
+    calendar = data['posts'].get(unique_key)
+    if calendar is None:
+        return 0
+    return calendar.count_between(first.toordinal(), last.toordinal())
+
+# ================== ANALYTICS ==================
+
+def percentile(sorted_values, q):
+    """Linearly interpolated percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * q / 100
+    low = int(position)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (position - low)
+
+def activity_report(partition, today, days=7):
+    """Posting summary for one server over the `days` days ending today"""
+    first = today - days + 1
+    keys = list(partition['creators'])
+    counts = []
+    for unique_key in keys:
+        calendar = partition['posts'].get(unique_key)
+        counts.append(calendar.count_between(first, today) if calendar else 0)
+    ordered = sorted(counts)
+    return {
+        'keys': keys,
+        'counts': counts,
+        'total_posts': sum(counts),
+        'active': sum(1 for count in counts if count),
+        'perfect': [key for key, count in zip(keys, counts) if count >= days],
+        'needs_improvement': [(key, count) for key, count in zip(keys, counts) if count < 3],
+        'average': sum(counts) / len(counts) if counts else 0.0,
+        'p50': percentile(ordered, 50),
+        'p90': percentile(ordered, 90),
+    }
+
+# ================== DASHBOARD VIEWS ==================
+
+def post_status(last_posted, today):
+    """Dashboard status emoji for a creator's last post date"""
+    if not last_posted:
+        return "❓"
+    days_since = today - day_ordinal(last_posted)
+    if days_since == 0:
+        return "✅"
+    elif days_since <= 1:
+        return "⚠️"
+    return "❌"
+
+DASHBOARD_PAGE_SIZE = 20  # Embeds allow 25 fields
+STATUSES = ("✅", "⚠️", "❌", "❓")
+STATUS_ALIASES = {
+    'today': "✅", 'posted': "✅",
+    'yesterday': "⚠️", 'warning': "⚠️",
+    'missed': "❌", 'late': "❌",
+    'never': "❓", 'new': "❓",
+}
+
+def parse_status(text):
+    """Status emoji for a !dashboard filter argument, or None if unknown"""
+    text = text.strip().lower()
+    for status in STATUSES:
+        if text.replace('\ufe0f', '') == status.replace('\ufe0f', ''):
+            return status
+    return STATUS_ALIASES.get(text)
+
+class DashboardView:
+    """Materialized !dashboard for one server.
+
+    Keeps the server's creators in OrderedDicts, oldest post first: one
+    for the whole server plus one bucket per status. Each journal record
+    patches them in O(1), a post moving its creator to the end and a new
+    creator going to the front, instead of re-sorting. A page is read
+    newest first by walking one of them in reverse, so its cost is paid
+    per render, not per post. Rendered pages are cached until a record
+    touches the server or the day changes, which is also when the buckets
+    are rebuilt.
+    """
+
+    def __init__(self, partition):
+        creators = partition['creators']
+        self.order = OrderedDict.fromkeys(sorted(creators, key=lambda key: creators[key].get('last_posted') or ''))
+        self.buckets = None  # status: OrderedDict of creator keys in the same order, valid for self.day
+        self.pages = {}  # (status, page): cached embed
+        self.day = None
+        self.guild_name = None
+
+    def apply(self, record):
+        """Patch the order and buckets for a record touching this server"""
+        if record['op'] not in ('setup', 'post'):
+            return
+        unique_key = f"{record['guild_id']}_{record['creator_id']}"
+        if record['op'] == 'post':
+            # A new post is always the most recent one
+            self.order[unique_key] = None
+            self.order.move_to_end(unique_key)
+            if self.buckets is not None and day_ordinal(record['date']) == self.day:
+                for keys in self.buckets.values():
+                    keys.pop(unique_key, None)
+                self.buckets["✅"][unique_key] = None
+            else:
+                self.buckets = None
+        elif unique_key not in self.order:
+            self.order[unique_key] = None
+            self.order.move_to_end(unique_key, last=False)
+            if self.buckets is not None:
+                self.buckets["❓"][unique_key] = None
+                self.buckets["❓"].move_to_end(unique_key, last=False)
+        self.pages = {}
+
+    def render(self, guild_name, partition, page=0, status=None):
+        """(embed, page, page count) for one page, optionally filtered by status"""
+        today = datetime.now().toordinal()
+        creators = partition['creators']
+        if self.buckets is None or self.day != today:
+            self.buckets = {bucket: OrderedDict() for bucket in STATUSES}
+            for unique_key in self.order:
+                self.buckets[post_status(creators[unique_key].get('last_posted'), today)][unique_key] = None
+            self.day = today
+            self.pages = {}
+        if self.guild_name != guild_name:
+            self.guild_name = guild_name
+            self.pages = {}
         
-        for date_str in data['posts'][unique_key]:
-            post_date = datetime.strptime(date_str, '%Y-%m-%d')
-            if post_date >= cutoff:
-                count += 1
-    
-    return count
+        keys = self.order if status is None else self.buckets[status]
+        pages = max(1, -(-len(keys) // DASHBOARD_PAGE_SIZE))
+        page = min(max(page, 0), pages - 1)
+        if (status, page) in self.pages:
+            return self.pages[status, page], page, pages
+        
+        if status is None:
+            description = f"Tracking {len(creators)} creators in this server"
+        else:
+            description = f"{len(keys)} of {len(creators)} creators are {status}"
+        embed = discord.Embed(
+            title=f"📊 {guild_name} Dashboard",
+            description=description,
+            color=discord.Color.blue(),
+            timestamp=datetime.now()
+        )
+        
+        start = page * DASHBOARD_PAGE_SIZE
+        for unique_key in islice(reversed(keys), start, start + DASHBOARD_PAGE_SIZE):
+            info = creators[unique_key]
+            week_posts = get_posts_in_period(unique_key, 7)
+            last_posted = info.get('last_posted') or 'Never'
+            row_status = status or post_status(info.get('last_posted'), today)
+            
+            embed.add_field(
+                name=f"{row_status} {info['name']}",
+                value=f"Week: {week_posts}/7 | Streak: 🔥{info['current_streak']}\nLast: {last_posted}",
+                inline=False
+            )
+        
+        footer = f"Data for {guild_name} only"
+        if pages > 1:
+            footer = f"Page {page + 1}/{pages} • {footer}"
+        embed.set_footer(text=footer)
+        self.pages[status, page] = embed
+        return embed, page, pages
+
+class DashboardPager(discord.ui.View):
+    """Previous/next buttons for a multi-page dashboard"""
+
+    def __init__(self, guild_id, guild_name, status, page, pages):
+        super().__init__(timeout=300)
+        self.guild_id = guild_id
+        self.guild_name = guild_name
+        self.status = status
+        self.page = page
+        self.pages = pages
+        self._update_buttons()
+
+    def _update_buttons(self):
+        self.previous_page.disabled = self.page <= 0
+        self.next_page.disabled = self.page >= self.pages - 1
+
+    async def _show(self, interaction, page):
+        data = await store.guild(self.guild_id)
+        view = dashboard_views.get(self.guild_id)
+        if view is None:
+            view = dashboard_views[self.guild_id] = DashboardView(data)
+        embed, self.page, self.pages = view.render(self.guild_name, data, page, self.status)
+        self._update_buttons()
+        await interaction.response.edit_message(embed=embed, view=self)
+
+    @discord.ui.button(label="◀ Prev", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction, button):
+        await self._show(interaction, self.page - 1)
+
+    @discord.ui.button(label="Next ▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction, button):
+        await self._show(interaction, self.page + 1)
+
+dashboard_views = {}  # guild_id: DashboardView
+
+def update_dashboard_view(record):
+    """Store listener keeping materialized dashboards current"""
+    view = dashboard_views.get(record.get('guild_id'))
+    if view is not None:
+        view.apply(record)
+
+store.listeners.append(update_dashboard_view)
+
+def drop_dashboard_view(guild_id):
+    """Store unload listener: a view lives only as long as its server's partition"""
+    dashboard_views.pop(guild_id, None)
+
+store.unload_listeners.append(drop_dashboard_view)
 
 # ================== BACKGROUND TASKS ==================
 
-@tasks.loop(hours=12)
-async def check_reminders():
-    """Check and send reminders every 12 hours"""
-    data = load_data()
-    
-    for unique_key, creator_info in data['creators'].items():
-        last_posted = creator_info.get('last_posted')
-        last_reminded = creator_info.get('last_reminded')
+def reminder_due(state):
+    """When a creator's next reminder falls due, or None if they've never posted
+
+    Takes their reminder_state entry from the resident index, so nothing
+    has to load their server. Reminders fall due at the time of day the
+    creator last posted, so a day's reminders spread out like the posts
+    did instead of all landing at midnight. Creators whose DMs were closed
+    last time wait DM_CLOSED_RETRY first.
+    """
+    if not state or not state[0]:
+        return None
+    posted_at, last_reminded, dm_closed = state
+    posted_at = datetime.fromisoformat(posted_at)  # A bare date from before post times were kept is midnight
+    time_of_day = posted_at - datetime.combine(posted_at.date(), datetime.min.time())
+    due = posted_at + timedelta(days=REMINDER_DAYS)
+    if last_reminded:
+        due = max(due, datetime.strptime(last_reminded, '%Y-%m-%d') + time_of_day + timedelta(days=REMINDER_DAYS))
+    if dm_closed:
+        due = max(due, datetime.strptime(dm_closed, '%Y-%m-%d') + time_of_day + DM_CLOSED_RETRY)
+    return due
+
+class ReminderScheduler:
+    """Min-heap of each creator's next reminder time.
+
+    Rescheduling pushes a new entry and leaves the old one in the heap; it
+    is skipped when it surfaces, since due[] no longer matches it. Waiting
+    sleeps until the earliest deadline, a new earlier deadline, or at most
+    a minute, so reminders go out within a minute of falling due and each
+    wake-up only touches the reminders that are due.
+    """
+
+    MAX_SLEEP = 60
+
+    def __init__(self):
+        self.heap = []  # (due timestamp, unique_key), including stale entries
+        self.due = {}  # unique_key: its current due timestamp
+        self.wakeup = asyncio.Event()
+
+    def __len__(self):
+        return len(self.due)
+
+    def schedule(self, unique_key, when):
+        """Set (or with None, clear) a creator's next reminder time"""
+        if when is None:
+            self.due.pop(unique_key, None)
+            return
+        when = when.timestamp()
+        if self.due.get(unique_key) == when:
+            return
+        self.due[unique_key] = when
+        if not self.heap or when < self.heap[0][0]:
+            self.wakeup.set()
+        heappush(self.heap, (when, unique_key))
+        if len(self.heap) > 2 * len(self.due) + 1000:
+            # Mostly stale entries from frequent posters; rebuild from due[]
+            self.heap = [(due, key) for key, due in self.due.items()]
+            heapify(self.heap)
+
+    def pop_due(self, now):
+        """Keys whose reminders are due at `now`, removed from the schedule"""
+        keys = []
+        while self.heap and self.heap[0][0] <= now:
+            when, unique_key = heappop(self.heap)
+            if self.due.get(unique_key) == when:
+                del self.due[unique_key]
+                keys.append(unique_key)
+        return keys
+
+    async def wait_due(self):
+        """Sleep until at least one reminder is due, then pop the due ones"""
+        while True:
+            self.wakeup.clear()
+            keys = self.pop_due(time.time())
+            if keys:
+                return keys
+            timeout = self.MAX_SLEEP
+            if self.heap:
+                timeout = min(timeout, max(self.heap[0][0] - time.time(), 0))
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+reminders = ReminderScheduler()
+
+def schedule_reminder(record):
+    """Store listener moving a creator's reminder after each post, reminder or closed DM"""
+    if record['op'] == 'post':
+        unique_key = f"{record['guild_id']}_{record['creator_id']}"
+    elif record['op'] in ('remind', 'dm'):
+        unique_key = record['key']
+    else:
+        return
+    if not owns_guild(record['guild_id']):
+        return  # Another process's shard reminds this server
+    state = store.reminder_state(unique_key)
+    if state is not None:
+        reminders.schedule(unique_key, reminder_due(state))
+
+store.listeners.append(schedule_reminder)
+
+class TokenBucket:
+    """Paces callers to `rate` per second, allowing bursts of up to `burst` (0.1s worth by default)"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst or max(rate / 10, 1)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class UserResolver:
+    """Finds the User to DM from the cheapest source that has it.
+
+    Order: the gateway cache (bot.get_user, guild.get_member), then an LRU
+    of users found by earlier lookups, expired after USER_CACHE_TTL, then
+    REST fetch_user. Discord has no batch user endpoint, so warm() batches
+    the way it can: one gateway member query per server for up to 100
+    missing IDs, which spends no REST budget at all.
+    """
+
+    def __init__(self, size=USER_CACHE_SIZE, ttl=USER_CACHE_TTL):
+        self.size = size
+        self.ttl = ttl
+        self.users = OrderedDict()  # user_id: (expiry, user), least recently used first
+        self.stats = {'gateway_hits': 0, 'cache_hits': 0, 'misses': 0, 'member_queries': 0,
+                      'members_found': 0, 'fetch_failures': 0, 'fetch_seconds': 0.0}
+
+    def remember(self, user):
+        self.users[user.id] = (time.monotonic() + self.ttl, user)
+        self.users.move_to_end(user.id)
+        while len(self.users) > self.size:
+            self.users.popitem(last=False)
+
+    def cached(self, user_id, guild_id=None):
+        """A User or Member from the gateway or the LRU, or None"""
+        guild = bot.get_guild(int(guild_id)) if guild_id else None
+        user = bot.get_user(user_id) or (guild.get_member(user_id) if guild else None)
+        if user is not None:
+            self.stats['gateway_hits'] += 1
+            return user
+        entry = self.users.get(user_id)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self.users.move_to_end(user_id)
+                self.stats['cache_hits'] += 1
+                return entry[1]
+            del self.users[user_id]
+        return None
+
+    async def warm(self, wanted):
+        """Batch-load (user_id, guild_id) pairs missing from both caches via member queries"""
+        missing = {}  # guild_id: [user_id, ...]
+        for user_id, guild_id in wanted:
+            guild = bot.get_guild(int(guild_id))
+            if guild is None or bot.get_user(user_id) or guild.get_member(user_id):
+                continue
+            entry = self.users.get(user_id)
+            if entry is None or entry[0] <= time.monotonic():
+                missing.setdefault(guild, []).append(user_id)
         
-        if last_posted:
-            days_since_post = (datetime.now() - datetime.strptime(last_posted, '%Y-%m-%d')).days
-            
-            # Send reminder if hasn't posted in REMINDER_DAYS
-            if days_since_post >= REMINDER_DAYS:
-                should_remind = True
-                
-                # Check if we already reminded recently
-                if last_reminded:
-                    days_since_reminder = (datetime.now() - datetime.strptime(last_reminded, '%Y-%m-%d')).days
-                    if days_since_reminder < REMINDER_DAYS:
-                        should_remind = False
-                
-                if should_remind:
-                    try:
-                        creator_id = creator_info['creator_id']
-                        user = await bot.fetch_user(int(creator_id))
-                        channel_id = creator_info.get('channel_id')
-                        channel = bot.get_channel(int(channel_id)) if channel_id else None
-                        
-                        embed = discord.Embed(
-                            title="📱 Posting Reminder",
-                            description=f"You haven't posted in {days_since_post} days!",
-                            color=discord.Color.orange()
-                        )
-                        
-                        embed.add_field(
-                            name="Server",
-                            value=creator_info.get('guild_name', 'Unknown'),
-                            inline=True
-                        )
-                        
-                        if channel:
-                            embed.add_field(
-                                name="Your Channel",
-                                value=f"Post 'posted' in {channel.mention} when done!",
-                                inline=False
-                            )
-                        
-                        embed.add_field(
-                            name="Last Post",
-                            value=last_posted,
-                            inline=True
-                        )
-                        
-                        await user.send(embed=embed)
-                        
-                        # Update last reminded
-                        data['creators'][unique_key]['last_reminded'] = datetime.now().strftime('%Y-%m-%d')
-                        save_data(data)
-                        
-                    except:
-                        pass  # Can't DM user
+        for guild, user_ids in missing.items():
+            for start in range(0, len(user_ids), 100):
+                chunk = user_ids[start:start + 100]
+                self.stats['member_queries'] += 1
+                try:
+                    members = await guild.query_members(user_ids=chunk, limit=len(chunk))
+                except (asyncio.TimeoutError, discord.ClientException):
+                    continue  # Left to fetch_user
+                self.stats['members_found'] += len(members)
+                for member in members:
+                    self.remember(member)
 
-# ================== REPORTING COMMANDS ==================
+    async def resolve(self, user_id, guild_id=None, fetch_user=None):
+        """The User for an ID, fetching it over REST only when no cache has it"""
+        user = self.cached(user_id, guild_id)
+        if user is not None:
+            return user
+        self.stats['misses'] += 1
+        start = time.monotonic()
+        try:
+            user = await (fetch_user or bot.fetch_user)(user_id)
+        except Exception:
+            self.stats['fetch_failures'] += 1
+            raise
+        finally:
+            self.stats['fetch_seconds'] += time.monotonic() - start
+        self.remember(user)
+        return user
 
-@bot.command(name='dashboard')
-async def dashboard(ctx):
-    """Show dashboard for THIS SERVER ONLY"""
-    data = load_data()
-    guild_id = str(ctx.guild.id)
+class ReminderDispatcher:
+    """Sends a sweep's reminder DMs through a bounded pool of workers.
+
+    Every API call waits on the global bucket and on its route's bucket
+    first, so a big backlog drains at a steady rate under Discord's limits
+    instead of bursting into 429s. A 429 that still gets through is
+    waited out and retried by discord.py itself, which holds that route's
+    bucket meanwhile.
+    """
+
+    def __init__(self, workers=REMINDER_WORKERS, global_rate=REMINDER_GLOBAL_RATE, route_rate=REMINDER_ROUTE_RATE,
+                 resolver=None):
+        self.workers = workers
+        self.resolver = resolver or UserResolver()
+        self.global_bucket = TokenBucket(global_rate)
+        self.route_rate = route_rate
+        self.route_buckets = {}  # route: TokenBucket
+        self.stats = {'sweeps': 0, 'sent': 0, 'direct_sends': 0, 'closed': 0, 'failed': 0,
+                      'requests': 0, 'last_sweep_seconds': 0.0, 'last_sweep_rate': 0.0}
+
+    async def call(self, route, request):
+        """Await `request` once both buckets allow a call on `route`"""
+        bucket = self.route_buckets.get(route)
+        if bucket is None:
+            bucket = self.route_buckets[route] = TokenBucket(self.route_rate)
+        await bucket.acquire()
+        await self.global_bucket.acquire()
+        self.stats['requests'] += 1
+        return await request
+
+    async def deliver(self, creator_info):
+        """DM one creator their reminder.
+
+        Returns ('sent', 'closed' or 'failed', DM channel ID). A stored DM
+        channel is sent to directly, skipping the user lookup and
+        create_dm; one that has gone away is reopened.
+        """
+        embed = reminder_embed(creator_info)
+        channel_id = creator_info.get('dm_channel_id')
+        try:
+            if channel_id:
+                channel = bot.get_partial_messageable(int(channel_id), type=discord.ChannelType.private)
+                try:
+                    await self.call(f"send_dm {channel_id}", channel.send(embed=embed))
+                    self.stats['direct_sends'] += 1
+                    return 'sent', channel_id
+                except discord.NotFound:
+                    channel_id = None
+            user = await self.resolver.resolve(
+                int(creator_info['creator_id']), creator_info['guild_id'],
+                lambda user_id: self.call('fetch_user', bot.fetch_user(user_id))
+            )
+            dm_channel = user.dm_channel or await self.call('create_dm', user.create_dm())
+            channel_id = str(dm_channel.id)
+            # Message sends are rate limited per channel, so each DM gets its own bucket
+            await self.call(f"send_dm {channel_id}", dm_channel.send(embed=embed))
+            return 'sent', channel_id
+        except (discord.Forbidden, discord.NotFound):
+            return 'closed', channel_id  # DMs closed, no shared server, or the account is gone
+        except Exception as e:
+            print(f"Reminder DM to {creator_info['creator_id']} failed: {e!r}")  # Retried after REMINDER_RETRY
+            return 'failed', channel_id
+
+    async def sweep(self, jobs):
+        """Deliver (unique_key, creator_info) jobs; returns {outcome: [(unique_key, DM channel ID)]}"""
+        queue = asyncio.Queue()
+        for job in jobs:
+            queue.put_nowait(job)
+        results = {'sent': [], 'closed': [], 'failed': []}
+        
+        async def worker():
+            while not queue.empty():
+                unique_key, creator_info = queue.get_nowait()
+                outcome, channel_id = await self.deliver(creator_info)
+                results[outcome].append((unique_key, channel_id))
+        
+        self.route_buckets.clear()  # Per-channel buckets would otherwise pile up
+        start = time.monotonic()
+        await self.resolver.warm([(int(info['creator_id']), info['guild_id']) for key, info in jobs])
+        await asyncio.gather(*(worker() for _ in range(min(self.workers, len(jobs)))))
+        took = time.monotonic() - start
+        self.stats['sweeps'] += 1
+        self.stats['sent'] += len(results['sent'])
+        self.stats['closed'] += len(results['closed'])
+        self.stats['failed'] += len(results['failed'])
+        self.stats['last_sweep_seconds'] = took
+        self.stats['last_sweep_rate'] = len(results['sent']) / took if took else 0.0
+        return results
+
+dispatcher = ReminderDispatcher()
+
+@tasks.loop(seconds=0)
+async def check_reminders():
+    """Send reminders as they fall due, sleeping until the next deadline"""
+    due_keys = await reminders.wait_due()
+    if not leader.is_leader():
+        return  # Stepped down while waiting; the new leader sends these
+    jobs = []
+    for unique_key in due_keys:
+        guild_id = unique_key.split('_')[0]
+        if not owns_guild(guild_id):
+            continue
+        due = reminder_due(store.reminder_state(unique_key))
+        if due is None or due > datetime.now():
+            reminders.schedule(unique_key, due)  # Moved since it was scheduled
+            continue
+        data = await store.guild(guild_id)  # Only servers with a reminder to send load
+        creator_info = data['creators'].get(unique_key)
+        if creator_info is None:
+            continue
+        jobs.append((unique_key, creator_info))
+    if not jobs:
+        return
     
-    # Filter creators for this server only
-    server_creators = {
-        key: info for key, info in data['creators'].items()
-        if info.get('guild_id') == guild_id
-    }
+    creators = dict(jobs)
+    before = dict(dispatcher.resolver.stats)
+    results = await dispatcher.sweep(jobs)
     
-    if not server_creators:
-        await ctx.send("No creators being tracked in this server! Use `!setup @creator` in their channel.")
-        return
+    # One journal write (or transaction) for the whole sweep
+    today = datetime.now().strftime('%Y-%m-%d')
+    records = []
+    for unique_key, channel_id in results['sent']:
+        creator_info = creators[unique_key]
+        if channel_id != creator_info.get('dm_channel_id') or creator_info.get('dm_closed'):
+            records.append({'op': 'dm', 'guild_id': creator_info['guild_id'], 'key': unique_key,
+                            'channel_id': channel_id, 'closed': None})
+        records.append({'op': 'remind', 'guild_id': creator_info['guild_id'], 'key': unique_key, 'date': today})
+    for unique_key, channel_id in results['closed']:
+        records.append({'op': 'dm', 'guild_id': creators[unique_key]['guild_id'], 'key': unique_key,
+                        'channel_id': channel_id, 'closed': today})
+    await store.record_many(records)
+    for unique_key, channel_id in results['failed']:
+        reminders.schedule(unique_key, datetime.now() + REMINDER_RETRY)
+    
+    users = {key: value - before[key] for key, value in dispatcher.resolver.stats.items()}  # This sweep's share
+    fetch_ms = 1000 * users['fetch_seconds'] / users['misses'] if users['misses'] else 0
+    print(f"Reminders: {len(results['sent'])} sent, {len(results['closed'])} closed, {len(results['failed'])} failed in "
+          f"{dispatcher.stats['last_sweep_seconds']:.1f}s ({dispatcher.stats['last_sweep_rate']:.1f}/s); "
+          f"users: {users['gateway_hits']} gateway, {users['cache_hits']} cached, "
+          f"{users['misses']} fetched ({fetch_ms:.0f} ms avg)")
+
+@check_reminders.before_loop
+async def before_reminders():
+    """Wait for the gateway's caches, so the first sweep finds users and channels without fetching them"""
+    await bot.wait_until_ready()
+    schedule_all_reminders()
+
+def schedule_all_reminders():
+    """Schedule every creator on this process's shards once, from the index; posts reschedule from then on"""
+    for guild_id in owned_guild_ids():
+        for unique_key in store.creator_keys(guild_id):
+            reminders.schedule(unique_key, reminder_due(store.reminder_state(unique_key)))
+
+def reminder_embed(creator_info):
+    """The reminder DM for one creator"""
+    last_posted = creator_info['last_posted']
+    days_since_post = (datetime.now() - datetime.strptime(last_posted, '%Y-%m-%d')).days
+    channel_id = creator_info.get('channel_id')
+    channel = bot.get_channel(int(channel_id)) if channel_id else None
     
     embed = discord.Embed(
-        title=f"📊 {ctx.guild.name} Dashboard",
-        description=f"Tracking {len(server_creators)} creators in this server",
-        color=discord.Color.blue(),
-        timestamp=datetime.now()
+        title="📱 Posting Reminder",
+        description=f"You haven't posted in {days_since_post} days!",
+        color=discord.Color.orange()
     )
     
-    # Sort by most recent posts
-    sorted_creators = sorted(
-        server_creators.items(),
-        key=lambda x: x[1].get('last_posted', ''),
-        reverse=True
+    embed.add_field(
+        name="Server",
+        value=creator_info.get('guild_name', 'Unknown'),
+        inline=True
     )
     
-    for unique_key, info in sorted_creators[:20]:  # Discord embed limit
-        week_posts = get_posts_in_period(unique_key, 7)
-        
-        # Status emoji
-        last_posted = info.get('last_posted', 'Never')
-        if last_posted != 'Never':
-            days_since = (datetime.now() - datetime.strptime(last_posted, '%Y-%m-%d')).days
-            if days_since == 0:
-                status = "✅"
-            elif days_since <= 1:
-                status = "⚠️"
-            else:
-                status = "❌"
-        else:
-            status = "❓"
-        
+    if channel:
         embed.add_field(
-            name=f"{status} {info['name']}",
-            value=f"Week: {week_posts}/7 | Streak: 🔥{info['current_streak']}\nLast: {last_posted}",
+            name="Your Channel",
+            value=f"Post 'posted' in {channel.mention} when done!",
             inline=False
         )
     
-    embed.set_footer(text=f"Data for {ctx.guild.name} only")
-    await ctx.send(embed=embed)
+    embed.add_field(
+        name="Last Post",
+        value=last_posted,
+        inline=True
+    )
+    return embed
+
+@tasks.loop(seconds=LEADER_LEASE_SECONDS / 3)
+async def elect_leader():
+    """Renew or contest the leader lease, starting and stopping reminders to match"""
+    change = await leader.heartbeat()
+    store.compacting = leader.is_leader()
+    if change == 'elected':
+        await store.reload()  # Pick up what the previous leader recorded
+        print(f"Leader for {leader.name} as {leader.holder}: sending reminders and compacting")
+        if check_reminders.is_running():
+            check_reminders.restart()  # Still winding down from an earlier term
+        else:
+            check_reminders.start()
+    elif change == 'deposed':
+        check_reminders.stop()
+        print(f"Standby for {leader.name}: another copy holds the lease")
+    elif leader.is_leader() and not check_reminders.is_running():
+        print("Reminder task stopped on the leader; restarting it")  # Died on an error it didn't handle
+        check_reminders.start()
+
+@tasks.loop(seconds=1)
+async def compact_store():
+    """Fold the journal into snapshots when due and unload idle servers"""
+    await store.maybe_compact()
+    store.evict_idle()
+
+@tasks.loop(hours=1)
+async def verify_rolling_counters():
+    """Cross-check the rolling week/month counters against the raw history, rebuilding any that drifted"""
+    drifted = store.check_rolling_counters()
+    for unique_key in drifted:
+        store.guilds[unique_key.split('_')[0]]['posts'][unique_key].rolling = None  # Rebuilt on next read
+    if drifted:
+        print(f"Rolling counters had drifted for {len(drifted)} creators and were rebuilt: {', '.join(drifted[:10])}")
+
+# ================== REPORTING COMMANDS ==================
+
+@bot.command(name='dashboard')
+async def dashboard(ctx, status: str = None):
+    """Show dashboard for THIS SERVER ONLY, optionally only creators with one status"""
+    status_filter = None
+    if status is not None:
+        status_filter = parse_status(status)
+        if status_filter is None:
+            await ctx.send(f"Unknown status filter. Use one of {' '.join(STATUSES)} (or today/yesterday/missed/never).")
+            return
+    
+    guild_id = str(ctx.guild.id)
+    data = await store.guild(guild_id)
+    
+    # This server's creators only
+    server_creators = data['creators']
+    
+    if not server_creators:
+        await ctx.send("No creators being tracked in this server! Use `!setup @creator` in their channel.")
+        return
+    
+    view = dashboard_views.get(guild_id)
+    if view is None:
+        view = dashboard_views[guild_id] = DashboardView(data)
+    
+    embed, page, pages = view.render(ctx.guild.name, data, 0, status_filter)
+    if pages > 1:
+        await ctx.send(embed=embed, view=DashboardPager(guild_id, ctx.guild.name, status_filter, page, pages))
+    else:
+        await ctx.send(embed=embed)
 
 @bot.command(name='weekly')
 async def weekly_report(ctx):
     """Get weekly report FOR THIS SERVER"""
-    data = load_data()
     guild_id = str(ctx.guild.id)
+    data = await store.guild(guild_id)
     
-    # Filter for this server
-    server_creators = {
-        key: info for key, info in data['creators'].items()
-        if info.get('guild_id') == guild_id
-    }
+    # This server's creators only
+    server_creators = data['creators']
     
     if not server_creators:
         await ctx.send("No creators to report on in this server!")
@@ -473,25 +2415,14 @@ async def weekly_report(ctx):
         color=discord.Color.green()
     )
     
-    total_posts = 0
-    perfect_week = []
-    needs_improvement = []
-    
-    for unique_key, info in server_creators.items():
-        week_posts = get_posts_in_period(unique_key, 7)
-        total_posts += week_posts
-        
-        if week_posts >= 7:
-            perfect_week.append(info['name'])
-        elif week_posts < 3:
-            needs_improvement.append(f"{info['name']} ({week_posts}/7)")
-    
-    # Summary stats
-    active_creators = len([c for key, c in server_creators.items() if get_posts_in_period(key, 7) > 0])
+    # One pass over the whole server, counting each creator once
+    report = activity_report(data, datetime.now().toordinal(), 7)
+    perfect_week = [server_creators[key]['name'] for key in report['perfect']]
+    needs_improvement = [f"{server_creators[key]['name']} ({count}/7)" for key, count in report['needs_improvement']]
     
     embed.add_field(
         name="📊 Overview",
-        value=f"Total Posts: {total_posts}\nActive Creators: {active_creators}/{len(server_creators)}\nAvg/Creator: {total_posts/len(server_creators) if server_creators else 0:.1f}",
+        value=f"Total Posts: {report['total_posts']}\nActive Creators: {report['active']}/{len(server_creators)}\nAvg/Creator: {report['average']:.1f}\nMedian: {report['p50']:.1f} | Top 10%: {report['p90']:.1f}+",
         inline=False
     )
     
@@ -518,8 +2449,8 @@ async def individual_stats(ctx, member: discord.Member = None):
     if member is None:
         member = ctx.author
     
-    data = load_data()
     guild_id = str(ctx.guild.id)
+    data = await store.guild(guild_id)
     creator_id = str(member.id)
     unique_key = f"{guild_id}_{creator_id}"
     
@@ -549,6 +2480,28 @@ async def individual_stats(ctx, member: discord.Member = None):
     embed.set_footer(text="Stats are specific to this server only")
     await ctx.send(embed=embed)
 
+@bot.command(name='shards')
+async def shard_status(ctx):
+    """Latency, servers and message rate for each shard in this process"""
+    latencies = getattr(bot, 'latencies', None) or [(0, bot.latency)]
+    embed = discord.Embed(
+        title="🛰️ Shard Status",
+        description=f"This server is on shard {ctx.guild.shard_id} of {bot.shard_count or 1}",
+        color=discord.Color.blue()
+    )
+    
+    for shard_id, latency in latencies:
+        guilds = sum(1 for guild in bot.guilds if guild.shard_id == shard_id)
+        embed.add_field(
+            name=f"Shard {shard_id}",
+            value=f"Latency: {latency * 1000:.0f} ms\nServers: {guilds}\n"
+                  f"Messages: {shard_stats.per_minute(shard_id):.1f}/min ({shard_stats.total(shard_id)} total)",
+            inline=True
+        )
+    
+    embed.set_footer(text=f"{leader.holder}: {'leader' if leader.is_leader() else 'standby'} for {leader.name}")
+    await ctx.send(embed=embed)
+
 @bot.command(name='help_tracker')
 async def help_tracker(ctx):
     """Show all commands"""
@@ -563,14 +2516,16 @@ async def help_tracker(ctx):
         ("!setup @creator", "Setup tracking in current channel"),
         ("!unsetup", "Remove tracking from current channel"),
         ("!channels", "List tracked channels in this server"),
+        ("!keywords [set|add|remove|lang|boundary|reset]", "Words that count as a post here"),
         ("", ""),
         ("**Reports (Server-Specific)**", ""),
-        ("!dashboard", "View this server's creators"),
+        ("!dashboard [status]", "View this server's creators (filter: ✅ ⚠️ ❌ ❓)"),
         ("!weekly", "Weekly report for this server"),
         ("!stats [@user]", "Individual stats in this server"),
+        ("!shards", "Latency and message rate per shard"),
         ("", ""),
         ("**Tracking**", ""),
-        ("Type 'posted'", "Creators type this to track"),
+        ("Type 'posted'", "Creators type this (or a !keywords word) to track"),
     ]
     
     for cmd, desc in commands_list:
@@ -581,5 +2536,119 @@ async def help_tracker(ctx):
     
     await ctx.send(embed=embed)
 
+# ================== CLUSTER MODE ==================
+
+def shard_ranges(shard_count, workers):
+    """Split shard IDs into contiguous, near-even ranges, one per worker"""
+    return [list(range(shard_count * i // workers, shard_count * (i + 1) // workers))
+            for i in range(workers)]
+
+class ClusterSupervisor:
+    """Runs the bot as several worker processes over one SQLite file.
+
+    Each worker is this script started with SHARD_COUNT and SHARD_IDS
+    set to its own range, so it only receives, schedules reminders for
+    and writes to the servers on those shards; that keeps every worker's
+    resident cache authoritative for the servers it owns. A worker that
+    exits is started again, waiting CLUSTER_RESTART_DELAY doubled for
+    each quick crash in a row, up to CLUSTER_RESTART_MAX_DELAY.
+    """
+
+    STABLE_AFTER = 60  # Seconds a worker must run before its crash count resets
+
+    def __init__(self, workers, shard_count=None):
+        shard_count = shard_count or workers
+        self.shard_count = shard_count
+        self.ranges = shard_ranges(shard_count, min(workers, shard_count))
+        self.procs = {}  # worker: Popen
+        self.started = {}  # worker: monotonic start time
+        self.crashes = {}  # worker: quick crashes in a row
+        self.restart_at = {}  # worker: monotonic time to start it again
+
+    def spawn(self, worker):
+        env = {
+            **os.environ,
+            'STORAGE_BACKEND': 'sqlite',
+            'SHARD_COUNT': str(self.shard_count),
+            'SHARD_IDS': ','.join(map(str, self.ranges[worker])),
+        }
+        proc = subprocess.Popen([sys.executable, os.path.abspath(__file__)], env=env)
+        self.procs[worker] = proc
+        self.started[worker] = time.monotonic()
+        shards = self.ranges[worker]
+        print(f"Worker {worker} started (pid {proc.pid}, shards {shards[0]}-{shards[-1]} of {self.shard_count})")
+
+    def check(self):
+        """Notice exited workers and start any whose restart wait is over"""
+        now = time.monotonic()
+        for worker, proc in list(self.procs.items()):
+            code = proc.poll()
+            if code is None:
+                continue
+            del self.procs[worker]
+            if now - self.started[worker] >= self.STABLE_AFTER:
+                self.crashes[worker] = 0
+            delay = min(CLUSTER_RESTART_DELAY * 2 ** self.crashes.get(worker, 0), CLUSTER_RESTART_MAX_DELAY)
+            self.crashes[worker] = self.crashes.get(worker, 0) + 1
+            self.restart_at[worker] = now + delay
+            print(f"Worker {worker} exited with code {code}; restarting in {delay:.0f}s")
+        for worker, when in list(self.restart_at.items()):
+            if now >= when:
+                del self.restart_at[worker]
+                self.spawn(worker)
+
+    def stop(self, timeout=30):
+        """Ask every worker to shut down, killing any that don't in time"""
+        for proc in self.procs.values():
+            proc.terminate()
+        deadline = time.monotonic() + timeout
+        for proc in self.procs.values():
+            try:
+                proc.wait(max(deadline - time.monotonic(), 0))
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+        self.procs.clear()
+
+    def run(self):
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        print(f"Cluster: {len(self.ranges)} workers over {self.shard_count} shards, storage {SQLITE_FILE}")
+        for worker in range(len(self.ranges)):
+            self.spawn(worker)
+        try:
+            while True:
+                time.sleep(1)
+                self.check()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
 if __name__ == "__main__":
-    bot.run(DISCORD_TOKEN)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--import-json', action='store_true',
+                        help=f"copy the JSON data in {DATA_DIR} into {SQLITE_FILE} and exit")
+    parser.add_argument('--export-json', metavar='PATH',
+                        help="write the whole dataset as pretty JSON to PATH and exit")
+    parser.add_argument('--cluster', metavar='K', type=int, nargs='?', const=0,
+                        help="run K worker processes (default CLUSTER_WORKERS, else one per CPU) "
+                             "sharing the SQLite store, restarting any that crash")
+    args = parser.parse_args()
+    
+    if args.import_json:
+        import_json_to_sqlite()
+        raise SystemExit
+    if args.export_json:
+        export_json(args.export_json)
+        raise SystemExit
+    if args.cluster is not None:
+        if STORAGE_BACKEND != 'sqlite':
+            parser.error("--cluster needs STORAGE_BACKEND=sqlite; the JSON journal only takes one writer")
+        ClusterSupervisor(args.cluster or CLUSTER_WORKERS or os.cpu_count() or 1, SHARD_COUNT).run()
+        raise SystemExit
+    
+    try:
+        bot.run(DISCORD_TOKEN)
+    finally:
+        store.close()
+        leader.release()
\ No newline at end of file